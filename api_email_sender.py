@@ -6,44 +6,372 @@ Documentation: https://comms.paradisestayz.com.au/api/integrations/v1/send
 
 import os
 import base64
+import contextlib
+import csv
+import functools
+import gzip
+import json
+import mmap
+import operator
 import requests
 import logging
-from pathlib import Path
-from datetime import date
-from dotenv import load_dotenv
-
-load_dotenv()
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # Faster JSON encoding/decoding (optional)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # SIMD-accelerated drop-in for base64 (optional)
+    import pybase64 as b64
+except ImportError:
+    b64 = base64
 
 logger = logging.getLogger(__name__)
 
-# Configuration from environment
-API_URL = os.getenv("COMMS_API_URL", "https://comms-centre-prod.ancient-fire-eaa9.workers.dev/api/integrations/v1/send")
-API_KEY = os.getenv("COMMS_API_KEY", "")
-EMAIL_TO = os.getenv("EMAIL_TO", "")  # Comma-separated list
-EMAIL_CC = os.getenv("EMAIL_CC", "")  # Comma-separated CC list
-SMS_SENDER_NOTIFY = os.getenv("SMS_SENDER_NOTIFY", "")  # E164 format
-ESCALATION_PHONE = os.getenv("ESCALATION_PHONE", "+61402526638")  # Default from user
-TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")  # Numeric Telegram Chat ID
+
+def _split_list(value: str) -> list[str]:
+    """Split a comma-separated config value into trimmed, non-empty items."""
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _load_config() -> None:
+    """(Re)read configuration from the environment into module globals."""
+    global API_URL, API_KEY, EMAIL_TO, EMAIL_CC, SMS_SENDER_NOTIFY, ESCALATION_PHONE, TELEGRAM_CHAT_ID, API_GZIP
+    global MAX_PAYLOAD_BYTES, API_MULTIPART, API_STREAM
+    global _EMAIL_RECIPIENTS, _CC_RECIPIENTS, _ESCALATION_PHONES, _TELEGRAM_PAYLOAD, _ESCALATION_SMS_PAYLOAD
+
+    # Configuration from environment
+    API_URL = os.getenv("COMMS_API_URL", "https://comms-centre-prod.ancient-fire-eaa9.workers.dev/api/integrations/v1/send")
+    API_KEY = os.getenv("COMMS_API_KEY", "")
+    EMAIL_TO = os.getenv("EMAIL_TO", "")  # Comma-separated list
+    EMAIL_CC = os.getenv("EMAIL_CC", "")  # Comma-separated CC list
+    SMS_SENDER_NOTIFY = os.getenv("SMS_SENDER_NOTIFY", "")  # E164 format
+    ESCALATION_PHONE = os.getenv("ESCALATION_PHONE", "+61402526638")  # Default from user
+    TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")  # Numeric Telegram Chat ID
+    API_GZIP = os.getenv("COMMS_API_GZIP", "").strip().lower() in ("1", "true", "yes")  # Gzip large request bodies
+    MAX_PAYLOAD_BYTES = int(os.getenv("COMMS_MAX_PAYLOAD_BYTES", "25000000"))  # Reject larger emails up front
+    API_MULTIPART = os.getenv("COMMS_API_MULTIPART", "").strip().lower() in ("1", "true", "yes")  # Raw file uploads
+    API_STREAM = os.getenv("COMMS_API_STREAM", "").strip().lower() in ("1", "true", "yes")  # Encode while sending
+
+    # Recipient lists parsed once from the static config above
+    _EMAIL_RECIPIENTS = _split_list(EMAIL_TO)
+    _CC_RECIPIENTS = _split_list(EMAIL_CC)
+    _ESCALATION_PHONES = _split_list(ESCALATION_PHONE)
+
+    # Payload skeletons for fixed-recipient channels; only "body" varies per send
+    _TELEGRAM_PAYLOAD = {"channels": ["telegram"], "to": [TELEGRAM_CHAT_ID]}
+    _ESCALATION_SMS_PAYLOAD = {"channels": ["sms"], "to": _ESCALATION_PHONES}
+
+
+# Read whatever the caller has already put in the environment; the .env file
+# itself is only parsed on first API use (see _ensure_env)
+_load_config()
+_ENV_LOADED = False
+
+
+# Attachment content types, keyed by lowercase extension (without the dot)
+_MIME_BY_EXT = {
+    "pdf": "application/pdf",
+    "csv": "text/csv",
+    "txt": "text/plain",
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "jpeg": "image/jpeg",
+}
+
+# Report CSV columns read by parse_csv, in the order they are unpacked
+_CSV_COLUMNS = (
+    "TrnReference1",  # Room ID
+    "textBox4",       # Booking number
+    "textBox2",       # Date, e.g. "Sunday, 4 January 2026"
+    "textBox20",      # Booking comments
+    "textBox32",      # Guest comments ("GC: ...")
+    "textBox33",      # Maintenance comments ("MC: ...")
+    "textBox16",      # Room type
+    "textBox6",       # Adults
+    "textBox7",       # Children
+    "textBox8",       # Infants
+    "textBox10",      # Arrival time
+    "textBox19",      # Guest name
+)
+_CSV_DEFAULTS = {"textBox6": "0", "textBox7": "0", "textBox8": "0"}
+
+# Room column values that mark report header/total rows rather than bookings
+_SKIP_ROOM_LABELS = frozenset({"total arrivals:", "total departures:", "daily totals:", "", "room"})
+
+# Single-pass HTML escaping for CSV-derived values interpolated into email bodies
+_HTML_ESCAPE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+# Inline style shared by report table cells
+_CELL_STYLE = "border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top;"
+# Comments column in the weekly report's per-day section tables
+_SECTION_COMMENTS_STYLE = _CELL_STYLE + " font-size: 0.85em; max-width: 200px; color: #555;"
+
+# Static HTML fragments for the report emails; per-row values are filled with str.format
+_TD = f"<td style='{_CELL_STYLE}'>"
+_TH = f"<th style='{_CELL_STYLE}'>"
+_TD_COMMENTS = f"<td style='{_CELL_STYLE} font-size: 0.85em; max-width: 250px; color: #555;'>"
+
+_DAILY_TABLE_OPEN = "<table style='border-collapse: collapse; width: 100%; font-family: sans-serif;'>"
+_DAILY_HEAD_ROW = (
+    f"<tr style='background-color: #f2f2f2;'>{_TH}Room</th>{_TH}Type</th>{_TH}Guest</th>"
+    f"{_TH}Guests</th>{_TH}{{time_label}}</th>{_TH}Comments</th></tr>"
+)
+_DAILY_ROW = (
+    f"<tr>{_TD}<b>{{room}}</b></td>{_TD}{{room_type}}</td>{_TD}{{name}}</td>"
+    f"{_TD}{{pax}}</td>{_TD}<b>{{time}}</b></td>{_TD_COMMENTS}<i>{{comments}}</i></td></tr>"
+)
+
+_WEEKLY_OVERVIEW_HEAD = """
+        <h3>📅 Weekly Overview</h3>
+        <table style='border-collapse: collapse; width: 100%; font-family: sans-serif; margin-bottom: 20px;'>
+            <tr style='background-color: #2c3e50; color: white;'>
+                <th style='border: 1px solid #ddd; padding: 10px; text-align: left;'>Day</th>
+                <th style='border: 1px solid #ddd; padding: 10px; text-align: left;'>Date</th>
+                <th style='border: 1px solid #ddd; padding: 10px; text-align: center;'>Check-Ins</th>
+                <th style='border: 1px solid #ddd; padding: 10px; text-align: center;'>Check-Outs</th>
+            </tr>
+        """
+_WEEKLY_SECTION_HEAD = f"""
+                <h4 style='margin: 10px 0 5px 0; color: {{color}};'>{{title}}</h4>
+                <table style='border-collapse: collapse; width: 100%; font-family: sans-serif; margin-bottom: 15px;'>
+                    <tr style='background-color: {{color}}; color: white;'>
+                        <th style='{_CELL_STYLE}'>Room</th>
+                        <th style='{_CELL_STYLE}'>Type</th>
+                        <th style='{_CELL_STYLE}'>Guest</th>
+                        <th style='{_CELL_STYLE}'>Guests</th>
+                        <th style='{_CELL_STYLE}'>Comments</th>
+                    </tr>
+                """
+_WEEKLY_SECTION_ROW = f"""
+                    <tr>
+                        <td style='{_CELL_STYLE}'><b>{{room}}</b></td>
+                        <td style='{_CELL_STYLE}'>{{room_type}}</td>
+                        <td style='{_CELL_STYLE}'>{{name}}</td>
+                        <td style='{_CELL_STYLE}'>{{pax}}</td>
+                        <td style='{_SECTION_COMMENTS_STYLE}'><i>{{comments}}</i></td>
+                    </tr>
+                    """
 
 
-def encode_file_base64(file_path: str) -> str:
-    """Read a file and return its base64-encoded content."""
-    with open(file_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")
+def _escape_html(value) -> str:
+    """Escape a report value for safe inclusion in the HTML email body."""
+    return str(value).translate(_HTML_ESCAPE)
 
 
+def _response_json(response) -> dict | None:
+    """Decode a 200 response body once; None for other statuses or non-JSON bodies."""
+    if response.status_code != 200:
+        return None
+    try:
+        data = orjson.loads(response.content) if orjson else json.loads(response.content)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _response_text(response) -> str:
+    """Return the raw response body for logging."""
+    return response.content.decode("utf-8", "replace")
+
+
+def _dumps(payload: dict) -> bytes:
+    """Serialize a request payload to JSON bytes."""
+    if orjson:
+        return orjson.dumps(payload)
+    return json.dumps(payload, separators=(",", ":")).encode("utf-8")
+
+
+# Bodies smaller than this (SMS/Telegram) are not worth compressing
+_GZIP_MIN_BYTES = 64 * 1024
+
+
+def _post_json(payload: dict, timeout: int):
+    """POST a pre-serialized JSON payload to the Comms Centre API."""
+    body = _dumps(payload)
+    if API_GZIP and len(body) > _GZIP_MIN_BYTES:
+        # Level 1 is cheap and still recovers most of the base64 overhead
+        response = _SESSION.post(
+            API_URL,
+            data=gzip.compress(body, compresslevel=1, mtime=0),
+            headers={"Content-Encoding": "gzip"},
+            timeout=timeout
+        )
+    else:
+        response = _SESSION.post(API_URL, data=body, timeout=timeout)
+    if response.status_code in (429, 503):
+        # Retries are exhausted by now; surface the server's hint for the next run
+        logger.warning(
+            f"Comms Centre still throttling after retries ({response.status_code}), "
+            f"Retry-After: {response.headers.get('Retry-After', 'not given')}"
+        )
+    return response
+
+
+def _post_multipart(payload: dict, attachments: list[tuple[str, os.stat_result]], timeout: int):
+    """POST payload fields plus raw attachment files as multipart/form-data (no base64)."""
+    fields = {key: value if isinstance(value, str) else _dumps(value).decode("utf-8")
+              for key, value in payload.items()}
+    with contextlib.ExitStack() as stack:
+        files = [
+            ("attachments", (os.path.basename(path), stack.enter_context(open(path, "rb")), get_mime_type(path)))
+            for path, _ in attachments
+        ]
+        # Drop the session's JSON Content-Type so requests can set the multipart boundary
+        return _SESSION.post(API_URL, data=fields, files=files, headers={"Content-Type": None}, timeout=timeout)
+
+
+def _build_session() -> requests.Session:
+    """Create the shared Comms Centre session (keep-alive pool + retry policy)."""
+    session = requests.Session()
+    retry_options = dict(
+        total=5,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+        respect_retry_after_header=True,  # Server hints on 429/503 override the backoff
+        raise_on_status=False  # Hand back the final response so callers log its body
+    )
+    try:
+        # Jitter keeps concurrent senders from retrying in lockstep (urllib3 2.x)
+        retry_strategy = Retry(backoff_jitter=0.5, **retry_options)
+    except TypeError:
+        retry_strategy = Retry(**retry_options)
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry_strategy)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "x-integration-key": API_KEY,
+        "Content-Type": "application/json"
+    })
+    return session
+
+
+# Reused by every send so repeated calls to the same host skip DNS/TCP/TLS setup
+_SESSION = _build_session()
+
+
+def _ensure_env() -> None:
+    """Load .env once, on first API use, and refresh config if it added anything.
+
+    Set PARADISE_SKIP_DOTENV=1 where the environment is provisioned externally
+    (systemd, container) to skip importing and parsing dotenv altogether.
+    """
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    _ENV_LOADED = True
+    if os.getenv("PARADISE_SKIP_DOTENV"):
+        return
+
+    from dotenv import load_dotenv
+
+    known = set(os.environ)
+    load_dotenv()
+    if known.issuperset(os.environ):
+        return  # nothing new; keep the import-time values
+
+    _load_config()
+    _SESSION.headers["x-integration-key"] = API_KEY
+
+
+# Input block size for streaming base64; a multiple of 3 so no block emits padding
+_B64_CHUNK = 57 * 1024
+
+
+def encode_file_base64(file_path: str, size: int | None = None) -> str:
+    """Read a file and return its base64-encoded content.
+
+    Pass the file size if it is already known (e.g. from os.stat) to skip another stat.
+    """
+    with open(file_path, "rb") as f:
+        if size is None:
+            size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return ""  # mmap cannot map an empty file
+        # Encode straight from the page cache, block by block, into an exact-size buffer
+        out = bytearray(((size + 2) // 3) * 4)
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm, \
+                memoryview(mm) as src, memoryview(out) as dst:
+            pos = 0
+            for start in range(0, size, _B64_CHUNK):
+                encoded = b64.b64encode(src[start:start + _B64_CHUNK])
+                dst[pos:pos + len(encoded)] = encoded
+                pos += len(encoded)
+    return out.decode("ascii")
+
+
+@functools.lru_cache(maxsize=16)
+def _encode_cached(file_path: str, mtime_ns: int, size: int) -> str:
+    """Base64-encode a file, memoized on its identity so retries skip re-encoding."""
+    return encode_file_base64(file_path, size)
+
+
+@functools.lru_cache(maxsize=64)
 def get_mime_type(file_path: str) -> str:
     """Get MIME type based on file extension."""
-    ext = Path(file_path).suffix.lower()
-    mime_types = {
-        ".pdf": "application/pdf",
-        ".csv": "text/csv",
-        ".txt": "text/plain",
-        ".png": "image/png",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
+    return _MIME_BY_EXT.get(file_path.rpartition(".")[2].lower(), "application/octet-stream")
+
+
+def _stat_attachments(attachment_paths: list[str]) -> list[tuple[str, os.stat_result]]:
+    """Stat each attachment once, dropping (and logging) any that are missing."""
+    found = []
+    for file_path in attachment_paths:
+        try:
+            found.append((file_path, os.stat(file_path)))
+        except FileNotFoundError:
+            logger.warning(f"Attachment not found: {file_path}")
+    return found
+
+
+def _build_attachment(file_path: str, st: os.stat_result) -> dict:
+    """Build one API attachment entry from a file and its stat result."""
+    return {
+        "filename": os.path.basename(file_path),
+        "content": _encode_cached(file_path, st.st_mtime_ns, st.st_size),
+        "contentType": get_mime_type(file_path)
     }
-    return mime_types.get(ext, "application/octet-stream")
+
+
+class _StreamingPayload:
+    """
+    Re-iterable JSON request body that base64-encodes attachments while it is sent.
+    Only one chunk per file is held in memory; a fresh pass is made on each retry.
+    """
+
+    def __init__(self, payload: dict, attachments: list[tuple[str, os.stat_result]]):
+        self.payload = payload
+        self.attachments = attachments
+
+    def __iter__(self):
+        head = _dumps(self.payload)
+        yield head[:-1] + b',"attachments":['
+        for i, (file_path, _) in enumerate(self.attachments):
+            meta = _dumps({"filename": os.path.basename(file_path), "contentType": get_mime_type(file_path)})
+            yield (b"," if i else b"") + meta[:-1] + b',"content":"'
+            with open(file_path, "rb") as f:
+                # _B64_CHUNK is a multiple of 3, so the encoded chunks concatenate cleanly
+                while chunk := f.read(_B64_CHUNK):
+                    yield b64.b64encode(chunk)
+            yield b'"}'
+        yield b"]}"
+
+
+def _post_stream(payload: dict, attachments: list[tuple[str, os.stat_result]], timeout: int):
+    """POST the JSON payload with attachments encoded on the fly (chunked transfer)."""
+    return _SESSION.post(API_URL, data=_StreamingPayload(payload, attachments), timeout=timeout)
 
 
 def send_email_via_comms_centre(
@@ -56,31 +384,26 @@ def send_email_via_comms_centre(
     """
     Send an email with multiple base64-encoded attachments via Comms Centre API.
     """
+    _ensure_env()
     if not API_KEY:
         logger.error("COMMS_API_KEY not configured in .env")
         return False
     
-    recipients = to_emails or [e.strip() for e in EMAIL_TO.split(",") if e.strip()]
+    recipients = to_emails or _EMAIL_RECIPIENTS
     if not recipients:
         logger.error("No recipients configured (EMAIL_TO)")
         return False
     
-    # Build attachments list according to API spec: { filename, content (base64), contentType }
-    attachments = []
-    for file_path in attachment_paths:
-        if not os.path.exists(file_path):
-            logger.warning(f"Attachment not found: {file_path}")
-            continue
-            
-        file_name = Path(file_path).name
-        file_content = encode_file_base64(file_path)
-        content_type = get_mime_type(file_path)
-        
-        attachments.append({
-            "filename": file_name,
-            "content": file_content,
-            "contentType": content_type
-        })
+    found = _stat_attachments(attachment_paths or [])
+    
+    # Fail fast, before encoding anything, if the base64 payload would be rejected anyway
+    projected = len(body or "") + len(html_body or "") + sum(((st.st_size + 2) // 3) * 4 for _, st in found)
+    if projected > MAX_PAYLOAD_BYTES:
+        logger.error(
+            f"Email payload too large: ~{projected:,} bytes exceeds limit of {MAX_PAYLOAD_BYTES:,} "
+            f"(COMMS_MAX_PAYLOAD_BYTES)"
+        )
+        return False
     
     # Build request payload based on API docs
     payload = {
@@ -88,54 +411,47 @@ def send_email_via_comms_centre(
         "to": recipients,
         "subject": subject,
         "body": body,
-        "html": html_body,
-        "attachments": attachments
+        "html": html_body
     }
     
     # Add CC if configured
-    cc_list = [e.strip() for e in EMAIL_CC.split(",") if e.strip()]
-    if cc_list:
-        payload["cc"] = cc_list
-    
-    headers = {
-        "x-integration-key": API_KEY,
-        "Content-Type": "application/json"
-    }
+    if _CC_RECIPIENTS:
+        payload["cc"] = _CC_RECIPIENTS
+    
+    if not (API_MULTIPART or API_STREAM):
+        # Build attachments list according to API spec: { filename, content (base64), contentType }
+        # Files are read and encoded concurrently; map() keeps the original order.
+        attachments = []
+        if found:
+            with ThreadPoolExecutor(max_workers=min(4, len(found))) as executor:
+                attachments = list(executor.map(lambda item: _build_attachment(*item), found))
+        payload["attachments"] = attachments
     
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
-
     try:
         logger.info(f"Triggering Comms Centre API: POST {API_URL}")
-        logger.info(f"Targeting {len(recipients)} recipient(s) with {len(attachments)} attachment(s)...")
-        
-        # Use a session with retry logic for robustness
-        session = requests.Session()
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["POST"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("https://", adapter)
+        logger.info(f"Targeting {len(recipients)} recipient(s) with {len(found)} attachment(s)...")
         
-        response = session.post(API_URL, json=payload, headers=headers, timeout=60)
+        if API_MULTIPART:
+            response = _post_multipart(payload, found, timeout=60)
+        elif API_STREAM:
+            response = _post_stream(payload, found, timeout=60)
+        else:
+            response = _post_json(payload, timeout=60)
         
         if response.status_code == 200:
-            res_json = response.json()
-            if res_json.get("success"):
+            res_json = _response_json(response)
+            if res_json and res_json.get("success"):
                 logger.info("✓ Comms Centre API: Message sent successfully!")
                 return True
             else:
-                logger.error(f"Comms Centre API error status: {res_json}")
+                logger.error(f"Comms Centre API error status: {res_json or _response_text(response)}")
                 return False
         elif response.status_code == 405:
             logger.error(f"Comms Centre API error: 405 Method Not Allowed. Is the URL correct? URL: {API_URL}")
             logger.error(f"Allowed methods: {response.headers.get('Allow', 'Not specified')}")
             return False
         else:
-            logger.error(f"Comms Centre API error: {response.status_code} - {response.text}")
+            logger.error(f"Comms Centre API error: {response.status_code} - {_response_text(response)}")
             return False
             
     except Exception as e:
@@ -145,32 +461,58 @@ def send_email_via_comms_centre(
 
 def parse_csv(file_path: str) -> list[dict]:
     """Helper to parse CSV and get rows."""
-    import csv
+    if not file_path:
+        return []
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return []
+    # Rows are memoized per file version; hand out copies so callers can't corrupt the cache
+    return [row.copy() for row in _parse_csv_cached(file_path, st.st_mtime_ns, st.st_size)]
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_csv_cached(file_path: str, mtime_ns: int, size: int) -> list[dict]:
+    """Parse a report CSV, memoized on its identity so re-reads of an unchanged file are free."""
     data = []
-    if not file_path or not os.path.exists(file_path):
-        return data
-        
     try:
         with open(file_path, "r", encoding="utf-8-sig", errors="replace") as f:
-            reader = csv.DictReader(f)
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if not header:
+                return data
+            # Resolve column positions once; columns missing from the header
+            # point past its end into a tail of per-column defaults
+            idx = {name: i for i, name in enumerate(header)}
+            missing = [col for col in _CSV_COLUMNS if col not in idx]
+            for offset, col in enumerate(missing):
+                idx[col] = len(header) + offset
+            blank = [_CSV_DEFAULTS.get(col, "") for col in header + missing]
+            width = len(blank)
+            pick = operator.itemgetter(*(idx[name] for name in _CSV_COLUMNS))
+            
             for row in reader:
+                if len(row) != width:
+                    # Ragged row (or absent columns): pad from the defaults
+                    row = row[:len(header)] + blank[min(len(row), len(header)):]
+                (room, booking_ref, date_str, t20, gc, mc,
+                 room_type, adults, children, infants, time_str, name) = pick(row)
                 # Filter out empty rows or total/header rows
                 # Correct mapping: TrnReference1 is the Room ID, textBox4 is the Booking Number
-                room = row.get("TrnReference1", "").strip()
-                booking_ref = row.get("textBox4", "").strip()
-                date_str = row.get("textBox2", "").strip()  # e.g. "Sunday, 4 January 2026"
+                room = room.strip()
+                room_lc = room.lower()
                 
-                if room and room.lower() not in ["total arrivals:", "total departures:", "daily totals:", "", "room"]:
+                if room_lc not in _SKIP_ROOM_LABELS:
                     # Filter out BONDREFUND entries (cancelled bookings, refund placeholders)
-                    if "BONDREFUND" in room.upper():
+                    if "bondrefund" in room_lc:
                         continue
                     # Verify it's a real room number (starts with digit or letter for named rooms)
-                    first_char = room.replace(" ", "").replace("-", "")[:1]
+                    first_char = next((c for c in room if c not in " -"), "")
                     if first_char.isalnum():
                         # Extract comments
-                        t20 = row.get("textBox20", "").strip()
-                        gc = row.get("textBox32", "").strip()
-                        mc = row.get("textBox33", "").strip()
+                        t20 = t20.strip()
+                        gc = gc.strip()
+                        mc = mc.strip()
                         
                         comments_parts = []
                         if t20: comments_parts.append(t20)
@@ -179,14 +521,14 @@ def parse_csv(file_path: str) -> list[dict]:
                         
                         data.append({
                             "room": room,
-                            "booking_ref": booking_ref,
-                            "room_type": row.get("textBox16", "").strip(),
-                            "adults": row.get("textBox6", "0"),
-                            "children": row.get("textBox7", "0"),
-                            "infants": row.get("textBox8", "0"),
-                            "time": row.get("textBox10", "").strip(),
-                            "name": row.get("textBox19", "").strip() or "Guest",
-                            "date": date_str,
+                            "booking_ref": booking_ref.strip(),
+                            "room_type": room_type.strip(),
+                            "adults": adults,
+                            "children": children,
+                            "infants": infants,
+                            "time": time_str.strip(),
+                            "name": name.strip() or "Guest",
+                            "date": date_str.strip(),  # e.g. "Sunday, 4 January 2026"
                             "comments": " | ".join(comments_parts)
                         })
     except Exception as e:
@@ -194,33 +536,45 @@ def parse_csv(file_path: str) -> list[dict]:
     return data
 
 
-def parse_csv_by_date(file_path: str) -> dict:
+_MONTHS = {
+    name: number for number, name in enumerate(
+        ("january", "february", "march", "april", "may", "june", "july",
+         "august", "september", "october", "november", "december"),
+        start=1,
+    )
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_report_date(date_str: str) -> date:
+    """Parse a report date like 'Sunday, 4 January 2026'; unknown dates sort last."""
+    # Remove day name prefix
+    if ", " in date_str:
+        date_str = date_str.split(", ", 1)[1]
+    try:
+        day, month, year = date_str.split()
+        return date(int(year), _MONTHS[month.lower()], int(day))
+    except (ValueError, KeyError):
+        return date.max
+
+
+def parse_csv_by_date(source: str | list[dict]) -> dict:
     """
     Parse CSV and group entries by date, sorted chronologically (nearest first).
+    Accepts a CSV path or rows already returned by parse_csv.
     Returns: { 'Sunday, 4 January 2026': [entries...], ... }
     """
-    from datetime import datetime
-    from collections import defaultdict
     
-    entries = parse_csv(file_path)
+    entries = source if isinstance(source, list) else parse_csv(source)
     by_date = defaultdict(list)
     
     for entry in entries:
         date_str = entry.get("date", "Unknown")
         by_date[date_str].append(entry)
     
-    # Sort dates chronologically (nearest first)
-    def parse_date(date_str):
-        """Parse date string like 'Sunday, 4 January 2026' to datetime."""
-        try:
-            # Remove day name prefix
-            if ", " in date_str:
-                date_str = date_str.split(", ", 1)[1]
-            return datetime.strptime(date_str, "%d %B %Y")
-        except:
-            return datetime.max  # Unknown dates go to end
-    
-    sorted_dates = sorted(by_date.keys(), key=parse_date)
+    # Sort dates chronologically (nearest first); parses are memoized, so the
+    # weekly report's merged date sort reuses them
+    sorted_dates = sorted(by_date, key=_parse_report_date)
     
     return {date: by_date[date] for date in sorted_dates}
 
@@ -229,20 +583,19 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
     Convenience function to send the cleaning reports via Comms Centre.
     report_type: 'Daily' or 'Weekly'
     """
-    import csv
-    from datetime import datetime, timedelta
+    _ensure_env()
     
-    current_time = datetime.now()
+    today = date.today()
     
     if report_type == "Weekly":
         # Next 7 days
-        start_date = current_time.date()
+        start_date = today
         end_date = start_date + timedelta(days=6)
         date_str = f"{start_date.strftime('%d %b')} - {end_date.strftime('%d %b')}"
         date_title = f"Next 7 Days ({date_str})"
     else:
         # Tomorrow (default)
-        report_date = (current_time + timedelta(days=1))
+        report_date = today + timedelta(days=1)
         date_str = report_date.strftime("%d %b (%A)")  # e.g. 01 Jan (Thursday)
         date_title = f"{date_str}"
     
@@ -262,22 +615,24 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
         if not rows:
             return f"<p>No {title.lower()} scheduled.</p>"
             
-        params = "border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top;"
-        comments_params = params + " font-size: 0.85em; max-width: 250px; color: #555;"
-        html = f"<h3>{title} ({len(rows)})</h3>"
-        html += "<table style='border-collapse: collapse; width: 100%; font-family: sans-serif;'>"
-        html += f"<tr style='background-color: #f2f2f2;'><th style='{params}'>Room</th><th style='{params}'>Type</th><th style='{params}'>Guest</th><th style='{params}'>Guests</th><th style='{params}'>{time_label}</th><th style='{params}'>Comments</th></tr>"
+        parts = [
+            f"<h3>{title} ({len(rows)})</h3>",
+            _DAILY_TABLE_OPEN,
+            _DAILY_HEAD_ROW.format(time_label=time_label),
+        ]
         
         for r in rows:
-            pax_lines = f"{r['adults']} adults<br>{r['children']} children<br>{r['infants']} infants"
-            time_val = r.get('time', '') or '-'
-            room_type = r.get('room_type', '') or '-'
-            comments = r.get('comments', '')
-            
-            html += f"<tr><td style='{params}'><b>{r['room']}</b></td><td style='{params}'>{room_type}</td><td style='{params}'>{r['name']}</td><td style='{params}'>{pax_lines}</td><td style='{params}'><b>{time_val}</b></td><td style='{comments_params}'><i>{comments}</i></td></tr>"
+            parts.append(_DAILY_ROW.format(
+                room=_escape_html(r['room']),
+                room_type=_escape_html(r.get('room_type', '') or '-'),
+                name=_escape_html(r['name']),
+                pax=f"{_escape_html(r['adults'])} adults<br>{_escape_html(r['children'])} children<br>{_escape_html(r['infants'])} infants",
+                time=_escape_html(r.get('time', '') or '-'),
+                comments=_escape_html(r.get('comments', '')),
+            ))
         
-        html += "</table>"
-        return html
+        parts.append("</table>")
+        return "".join(parts)
 
     summary_arr = f"{len(arrivals_data)} checking in"
     summary_dep = f"{len(departures_data)} checking out"
@@ -287,27 +642,18 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
         intro_text = f"Please find attached the weekly cleaning reports for {date_str}."
         header_text = f"Weekly Cleaning Schedule ({date_str})"
         
-        # Group data by date for weekly reports
-        arrivals_by_date = parse_csv_by_date(arrivals_csv)
-        departures_by_date = parse_csv_by_date(departures_csv)
+        # Group data by date for weekly reports (reusing the rows parsed above)
+        arrivals_by_date = parse_csv_by_date(arrivals_data)
+        departures_by_date = parse_csv_by_date(departures_data)
         
         # Get all unique dates and sort them
         all_dates = sorted(
             set(arrivals_by_date.keys()) | set(departures_by_date.keys()),
-            key=lambda d: datetime.strptime(d.split(", ", 1)[1], "%d %B %Y") if ", " in d else datetime.max
+            key=_parse_report_date
         )
         
         # Build summary table for top of email
-        summary_table_html = """
-        <h3>📅 Weekly Overview</h3>
-        <table style='border-collapse: collapse; width: 100%; font-family: sans-serif; margin-bottom: 20px;'>
-            <tr style='background-color: #2c3e50; color: white;'>
-                <th style='border: 1px solid #ddd; padding: 10px; text-align: left;'>Day</th>
-                <th style='border: 1px solid #ddd; padding: 10px; text-align: left;'>Date</th>
-                <th style='border: 1px solid #ddd; padding: 10px; text-align: center;'>Check-Ins</th>
-                <th style='border: 1px solid #ddd; padding: 10px; text-align: center;'>Check-Outs</th>
-            </tr>
-        """
+        summary_parts = [_WEEKLY_OVERVIEW_HEAD]
         
         total_arr = 0
         total_dep = 0
@@ -322,28 +668,44 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
             day_name = parts[0] if len(parts) > 1 else ""
             date_part = parts[1] if len(parts) > 1 else date_full
             
-            summary_table_html += f"""
+            summary_parts.append(f"""
             <tr>
-                <td style='border: 1px solid #ddd; padding: 8px;'><b>{day_name}</b></td>
-                <td style='border: 1px solid #ddd; padding: 8px;'>{date_part}</td>
+                <td style='border: 1px solid #ddd; padding: 8px;'><b>{_escape_html(day_name)}</b></td>
+                <td style='border: 1px solid #ddd; padding: 8px;'>{_escape_html(date_part)}</td>
                 <td style='border: 1px solid #ddd; padding: 8px; text-align: center; color: #27ae60;'><b>{arr_count}</b></td>
                 <td style='border: 1px solid #ddd; padding: 8px; text-align: center; color: #e74c3c;'><b>{dep_count}</b></td>
             </tr>
-            """
+            """)
         
         # Add totals row
-        summary_table_html += f"""
+        summary_parts.append(f"""
             <tr style='background-color: #f8f9fa; font-weight: bold;'>
                 <td colspan='2' style='border: 1px solid #ddd; padding: 10px; text-align: right;'>TOTAL</td>
                 <td style='border: 1px solid #ddd; padding: 10px; text-align: center; color: #27ae60;'>{total_arr}</td>
                 <td style='border: 1px solid #ddd; padding: 10px; text-align: center; color: #e74c3c;'>{total_dep}</td>
             </tr>
         </table>
-        """
+        """)
+        summary_table_html = "".join(summary_parts)
+        
+        # Helper to render a section table
+        def render_section_table(rows, header_color, section_title):
+            if not rows:
+                return ""
+            html = [_WEEKLY_SECTION_HEAD.format(color=header_color, title=section_title)]
+            for r in rows:
+                html.append(_WEEKLY_SECTION_ROW.format(
+                    room=_escape_html(r['room']),
+                    room_type=_escape_html(r.get('room_type', '-')),
+                    name=_escape_html(r['name']),
+                    pax=_escape_html(f"{r['adults']}A / {r['children']}C / {r['infants']}I"),
+                    comments=_escape_html(r.get('comments', '')),
+                ))
+            html.append("</table>")
+            return "".join(html)
         
         # Build day-by-day sections
-        day_sections_html = ""
-        params = "border: 1px solid #ddd; padding: 8px; text-align: left; vertical-align: top;"
+        day_parts = []
         
         for date_full in all_dates:
             day_arrivals = arrivals_by_date.get(date_full, [])
@@ -353,65 +715,36 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
             dep_other, dep_mantra = separate_mantra(day_departures)
             arr_other, arr_mantra = separate_mantra(day_arrivals)
             
-            day_sections_html += f"""
+            day_parts.append(f"""
             <div style='margin: 20px 0; padding: 15px; background-color: #f8f9fa; border-radius: 8px; border-left: 4px solid #3498db;'>
-                <h3 style='margin: 0 0 10px 0; color: #2c3e50;'>📆 {date_full}</h3>
+                <h3 style='margin: 0 0 10px 0; color: #2c3e50;'>📆 {_escape_html(date_full)}</h3>
                 <p style='margin: 0 0 15px 0; color: #666;'>
                     <span style='color: #e74c3c;'><b>{len(day_departures)}</b> Check-Outs</span> &nbsp;|&nbsp;
                     <span style='color: #27ae60;'><b>{len(day_arrivals)}</b> Check-Ins</span>
                 </p>
-            """
-            
-            # Helper to render a section table
-            def render_section_table(rows, header_color, section_title):
-                if not rows:
-                    return ""
-                comments_params = params + " font-size: 0.85em; max-width: 200px; color: #555;"
-                html = f"""
-                <h4 style='margin: 10px 0 5px 0; color: {header_color};'>{section_title}</h4>
-                <table style='border-collapse: collapse; width: 100%; font-family: sans-serif; margin-bottom: 15px;'>
-                    <tr style='background-color: {header_color}; color: white;'>
-                        <th style='{params}'>Room</th>
-                        <th style='{params}'>Type</th>
-                        <th style='{params}'>Guest</th>
-                        <th style='{params}'>Guests</th>
-                        <th style='{params}'>Comments</th>
-                    </tr>
-                """
-                for r in rows:
-                    pax = f"{r['adults']}A / {r['children']}C / {r['infants']}I"
-                    comments = r.get('comments', '')
-                    html += f"""
-                    <tr>
-                        <td style='{params}'><b>{r['room']}</b></td>
-                        <td style='{params}'>{r.get('room_type', '-')}</td>
-                        <td style='{params}'>{r['name']}</td>
-                        <td style='{params}'>{pax}</td>
-                        <td style='{comments_params}'><i>{comments}</i></td>
-                    </tr>
-                    """
-                html += "</table>"
-                return html
+            """)
             
             # Order: Departures (non-Mantra) → Departures (Mantra) → Arrivals (non-Mantra) → Arrivals (Mantra)
             if dep_other:
-                day_sections_html += render_section_table(dep_other, '#e74c3c', 'Departures')
+                day_parts.append(render_section_table(dep_other, '#e74c3c', 'Departures'))
             if dep_mantra:
-                day_sections_html += render_section_table(dep_mantra, '#e74c3c', 'Departures (Mantra)')
+                day_parts.append(render_section_table(dep_mantra, '#e74c3c', 'Departures (Mantra)'))
             if arr_other:
-                day_sections_html += render_section_table(arr_other, '#27ae60', 'Arrivals')
+                day_parts.append(render_section_table(arr_other, '#27ae60', 'Arrivals'))
             if arr_mantra:
-                day_sections_html += render_section_table(arr_mantra, '#27ae60', 'Arrivals (Mantra)')
+                day_parts.append(render_section_table(arr_mantra, '#27ae60', 'Arrivals (Mantra)'))
             
             # Show message if no departures at all
             if not day_departures:
-                day_sections_html += "<p style='color: #999; font-style: italic;'>No departures</p>"
+                day_parts.append("<p style='color: #999; font-style: italic;'>No departures</p>")
             
             # Show message if no arrivals at all
             if not day_arrivals:
-                day_sections_html += "<p style='color: #999; font-style: italic;'>No arrivals</p>"
+                day_parts.append("<p style='color: #999; font-style: italic;'>No arrivals</p>")
             
-            day_sections_html += "</div>"
+            day_parts.append("</div>")
+        
+        day_sections_html = "".join(day_parts)
         
         html_body = f"""
         <div style="font-family: sans-serif; line-height: 1.6; color: #333;">
@@ -438,15 +771,16 @@ def send_reports(arrivals_pdf: str, departures_pdf: str, arrivals_csv: str = Non
         arr_other, arr_mantra = separate_mantra(arrivals_data)
         
         # Build tables in order: Departures (non-Mantra) → Departures (Mantra) → Arrivals (non-Mantra) → Arrivals (Mantra)
-        tables_html = ""
+        table_parts = []
         if dep_other:
-            tables_html += make_table("Departures", dep_other, time_label="Check-out") + "<br>"
+            table_parts += (make_table("Departures", dep_other, time_label="Check-out"), "<br>")
         if dep_mantra:
-            tables_html += make_table("Departures (Mantra)", dep_mantra, time_label="Check-out") + "<br>"
+            table_parts += (make_table("Departures (Mantra)", dep_mantra, time_label="Check-out"), "<br>")
         if arr_other:
-            tables_html += make_table("Arrivals", arr_other, time_label="Check-in") + "<br>"
+            table_parts += (make_table("Arrivals", arr_other, time_label="Check-in"), "<br>")
         if arr_mantra:
-            tables_html += make_table("Arrivals (Mantra)", arr_mantra, time_label="Check-in")
+            table_parts.append(make_table("Arrivals (Mantra)", arr_mantra, time_label="Check-in"))
+        tables_html = "".join(table_parts)
         
         html_body = f"""
         <div style="font-family: sans-serif; line-height: 1.6; color: #333;">
@@ -477,17 +811,11 @@ See the email content for the detailed list.
 
 """
     
-    # Attachments: PDFs ONLY
-    attachments = []
-    for p in [arrivals_pdf, departures_pdf]:
-        if p and os.path.exists(p):
-            attachments.append(p)
+    # Attachments: PDFs ONLY (missing files are stat'ed, logged and dropped by the sender)
+    attachments = [p for p in (arrivals_pdf, departures_pdf) if p]
     
-    # === STEP 1: Send Email to Recipients ===
-    email_success = send_email_via_comms_centre(subject, body, html_body, attachments)
-    
-    # === STEP 2: SMS Summary to Sender (if configured) ===
-    sms_success = False
+    # === SMS Summary to Sender (if configured) ===
+    sms_body = None
     if SMS_SENDER_NOTIFY:
         if report_type == "Weekly":
             # Build per-day breakdown for weekly SMS
@@ -502,7 +830,13 @@ See the email content for the detailed list.
             sms_body = "\n".join(sms_lines)
         else:
             sms_body = f"{report_type} Cleaning {date_str}: {summary_arr}, {summary_dep}. Check email."
-        sms_success = send_sms_notification(SMS_SENDER_NOTIFY, sms_body)
+    
+    # === STEP 1 + 2: Email to Recipients and SMS to Sender, sent concurrently ===
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        email_future = executor.submit(send_email_via_comms_centre, subject, body, html_body, attachments)
+        sms_future = executor.submit(send_sms_notification, SMS_SENDER_NOTIFY, sms_body) if sms_body else None
+        email_success = email_future.result()
+        sms_success = sms_future.result() if sms_future else False
     
     # === STEP 3: Telegram Delivery Report ===
     telegram_report = f"📊 {report_type} Report Delivery for {date_str}:\n"
@@ -521,12 +855,13 @@ See the email content for the detailed list.
 
 def send_sms_notification(to_phones: str, message: str) -> bool:
     """Send an SMS notification to one or more phones (comma-separated)."""
+    _ensure_env()
     if not API_KEY:
         logger.error("API key not configured for SMS")
         return False
     
     # Split comma-separated phone numbers into a list
-    phone_list = [p.strip() for p in to_phones.split(",") if p.strip()]
+    phone_list = _split_list(to_phones)
     if not phone_list:
         logger.error("No valid phone numbers provided for SMS")
         return False
@@ -537,19 +872,15 @@ def send_sms_notification(to_phones: str, message: str) -> bool:
         "body": message
     }
     
-    headers = {
-        "x-integration-key": API_KEY,
-        "Content-Type": "application/json"
-    }
-    
     try:
         logger.info(f"Sending SMS to {phone_list}...")
-        response = requests.post(API_URL, json=payload, headers=headers, timeout=30)
-        if response.status_code == 200 and response.json().get("success"):
+        response = _post_json(payload, timeout=30)
+        res_json = _response_json(response)
+        if res_json and res_json.get("success"):
             logger.info("✓ SMS sent successfully")
             return True
         else:
-            logger.error(f"SMS failed: {response.text}")
+            logger.error(f"SMS failed: {_response_text(response)}")
             return False
     except Exception as e:
         logger.error(f"SMS error: {e}")
@@ -558,6 +889,7 @@ def send_sms_notification(to_phones: str, message: str) -> bool:
 
 def send_telegram_notification(message: str) -> bool:
     """Send a Telegram notification (uses default integration recipients)."""
+    _ensure_env()
     if not API_KEY:
         logger.error("API key not configured for Telegram")
         return False
@@ -566,25 +898,17 @@ def send_telegram_notification(message: str) -> bool:
         logger.warning("TELEGRAM_CHAT_ID not configured, skipping Telegram notification")
         return False
         
-    payload = {
-        "channels": ["telegram"],
-        "to": [TELEGRAM_CHAT_ID],
-        "body": message
-    }
-    
-    headers = {
-        "x-integration-key": API_KEY,
-        "Content-Type": "application/json"
-    }
+    payload = _TELEGRAM_PAYLOAD | {"body": message}
     
     try:
         logger.info("Sending Telegram notification...")
-        response = requests.post(API_URL, json=payload, headers=headers, timeout=30)
-        if response.status_code == 200 and response.json().get("success"):
+        response = _post_json(payload, timeout=30)
+        res_json = _response_json(response)
+        if res_json and res_json.get("success"):
             logger.info("✓ Telegram notification sent")
             return True
         else:
-            logger.error(f"Telegram failed: {response.text}")
+            logger.error(f"Telegram failed: {_response_text(response)}")
             return False
     except Exception as e:
         logger.error(f"Telegram error: {e}")
@@ -595,75 +919,51 @@ def send_failure_alert(error_message: str) -> bool:
     """
     Send an urgent failure notification via SMS and Telegram.
     """
+    _ensure_env()
     if not API_KEY:
         logger.error("COMMS_API_KEY not configured")
         return False
 
-    from requests.adapters import HTTPAdapter
-    from urllib3.util.retry import Retry
-
     body = f"🚨 URGENT: REI Automation FAILED\n\nError: {error_message}\n\nPlease check the server immediately."
     
-    headers = {
-        "x-integration-key": API_KEY,
-        "Content-Type": "application/json"
-    }
-    
-    # Setup session with retry
-    session = requests.Session()
-    retry = Retry(total=3, backoff_factor=1, status_forcelist=[500, 502, 503, 504])
-    session.mount("https://", HTTPAdapter(max_retries=retry))
-    
-    # Split comma-separated escalation phones into a list
-    escalation_phones = [p.strip() for p in ESCALATION_PHONE.split(",") if p.strip()]
-    
     # Build recipients list: phones for SMS, chat ID for Telegram
-    sms_recipients = escalation_phones if escalation_phones else []
+    sms_recipients = _ESCALATION_PHONES
     telegram_recipients = [TELEGRAM_CHAT_ID] if TELEGRAM_CHAT_ID else []
     
     logger.warning(f"Sending FAILURE ALERT via SMS to {sms_recipients}, Telegram to {telegram_recipients}...")
     
-    # Send SMS if we have phone numbers
-    sms_success = False
-    if sms_recipients:
-        sms_payload = {
-            "channels": ["sms"],
-            "to": sms_recipients,
-            "body": body
-        }
-        try:
-            response = session.post(API_URL, json=sms_payload, headers=headers, timeout=30)
-            sms_success = response.status_code == 200 and response.json().get("success")
-            if sms_success:
-                logger.info(f"✓ SMS escalation sent to {len(sms_recipients)} recipient(s)")
-            else:
-                logger.error(f"SMS escalation failed: {response.text}")
-        except Exception as e:
-            logger.error(f"SMS escalation error: {e}")
-    
-    # Send Telegram if configured
-    telegram_success = False
-    if telegram_recipients:
-        telegram_payload = {
-            "channels": ["telegram"],
-            "to": telegram_recipients,
-            "body": body
-        }
+    def send_escalation(label: str, payload: dict, sent_msg: str) -> bool:
         try:
-            response = session.post(API_URL, json=telegram_payload, headers=headers, timeout=30)
-            telegram_success = response.status_code == 200 and response.json().get("success")
-            if telegram_success:
-                logger.info("✓ Telegram escalation sent")
+            response = _post_json(payload, timeout=30)
+            success = bool((_response_json(response) or {}).get("success"))
+            if success:
+                logger.info(sent_msg)
             else:
-                logger.error(f"Telegram escalation failed: {response.text}")
+                logger.error(f"{label} escalation failed: {_response_text(response)}")
+            return success
         except Exception as e:
-            logger.error(f"Telegram escalation error: {e}")
+            logger.error(f"{label} escalation error: {e}")
+            return False
+
+    # SMS and Telegram are independent, so fan them out over the shared session
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sms_future = executor.submit(
+            send_escalation, "SMS", _ESCALATION_SMS_PAYLOAD | {"body": body},
+            f"✓ SMS escalation sent to {len(sms_recipients)} recipient(s)"
+        ) if sms_recipients else None
+        telegram_future = executor.submit(
+            send_escalation, "Telegram", _TELEGRAM_PAYLOAD | {"body": body},
+            "✓ Telegram escalation sent"
+        ) if telegram_recipients else None
+        sms_success = sms_future.result() if sms_future else False
+        telegram_success = telegram_future.result() if telegram_future else False
     
     return sms_success or telegram_success
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
+    _ensure_env()
     print("Comms Centre API Integration ready.")
     print(f"Endpoint: {API_URL}")
     print(f"API Key configured: {'YES' if API_KEY else 'NO'}")
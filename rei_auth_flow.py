@@ -2,11 +2,23 @@
 """Shared REI login helpers, including authenticator-app verification handling."""
 
 import logging
+import random
+import re
+import time
 
 from rei_credentials import get_rei_login_credentials, get_rei_totp
 
 
 LOGIN_URL_HINTS = ("b2clogin", "/login", "/account")
+# Azure B2C sign-in form
+EMAIL_INPUT_SELECTOR = "input#email"
+PASSWORD_INPUT_SELECTOR = "input#password"
+SIGN_IN_BUTTON_SELECTOR = "button#next"
+LOGIN_URL_RE = re.compile("|".join(re.escape(hint) for hint in LOGIN_URL_HINTS), re.IGNORECASE)
+# Delay between login attempts doubles from the base, with up to 50% jitter, capped at the max
+LOGIN_RETRY_BASE_DELAY = 1.0
+LOGIN_RETRY_MAX_DELAY = 30.0
+LOGIN_RETRY_JITTER = 0.5
 MFA_URL_HINTS = ("mfa", "multifactor", "verification", "verify", "totp", "otp")
 LOGIN_ERROR_SELECTORS = [
     ".error.itemLevel",
@@ -42,6 +54,35 @@ MFA_SUBMIT_SELECTORS = [
     "button:has-text('Next')",
     "button:has-text('Sign in')",
 ]
+# Runs the login-page markup checks in the browser so only a boolean crosses CDP
+LOGIN_MARKUP_PROBE = """() => {
+    const html = document.documentElement.outerHTML.toLowerCase();
+    return html.includes("member login") || (html.includes("password") && html.includes("email address"));
+}"""
+# Checks the page markup for any of the given hints in the browser so only a boolean crosses CDP
+MARKUP_HINT_PROBE = """(hints) => {
+    const html = document.documentElement.outerHTML.toLowerCase();
+    return hints.some((hint) => html.includes(hint));
+}"""
+# Returns the text of the first visible element matching any selector, in selector order
+VISIBLE_ERROR_TEXT_PROBE = """(selectors) => {
+    for (const selector of selectors) {
+        for (const el of document.querySelectorAll(selector)) {
+            const text = (el.textContent || "").trim();
+            if (el.offsetParent !== null && text) return text;
+        }
+    }
+    return "";
+}"""
+# Resolves once the page has left the B2C host and loaded, or a given selector is visible there
+AUTH_STEP_PROBE = """(selector) => {
+    if (!location.href.toLowerCase().includes("b2clogin")) {
+        return document.readyState === "complete";
+    }
+    return Array.from(document.querySelectorAll(selector)).some(
+        (el) => el.offsetParent !== null && (el.tagName === "INPUT" || el.textContent.trim())
+    );
+}"""
 MFA_TEXT_HINTS = (
     "verification code",
     "authenticator app",
@@ -60,6 +101,16 @@ def _get_logger(logger=None):
     return logger or logging.getLogger(__name__)
 
 
+def is_login_url(url):
+    """Return True if the URL belongs to the B2C or REI login flow."""
+    return bool(LOGIN_URL_RE.search(url or ""))
+
+
+def backoff_delay(retry, base_delay=LOGIN_RETRY_BASE_DELAY, max_delay=LOGIN_RETRY_MAX_DELAY, jitter=LOGIN_RETRY_JITTER):
+    """Seconds to wait before the given retry (0-based): exponential growth with jitter, capped."""
+    return min(max_delay, base_delay * 2 ** retry * (1 + random.uniform(0, jitter)))
+
+
 def locator_is_visible(target_page, selector):
     try:
         locator = target_page.locator(selector)
@@ -78,17 +129,11 @@ def _first_visible_selector(target_page, selectors):
 
 
 def get_visible_auth_error_text(target_page):
-    for selector in LOGIN_ERROR_SELECTORS:
-        try:
-            error_elem = target_page.locator(selector)
-            if error_elem.count() == 0 or not error_elem.first.is_visible():
-                continue
-            error_text = (error_elem.first.text_content() or "").strip()
-            if error_text:
-                return error_text
-        except Exception:
-            continue
-    return ""
+    """Return the first visible login error message, checked in one in-page evaluate."""
+    try:
+        return target_page.evaluate(VISIBLE_ERROR_TEXT_PROBE, LOGIN_ERROR_SELECTORS) or ""
+    except Exception:
+        return ""
 
 
 def page_requires_totp(target_page):
@@ -103,17 +148,20 @@ def page_requires_totp(target_page):
     if not fallback_selector:
         return False
 
+    mfa_hints = MFA_URL_HINTS + MFA_TEXT_HINTS
+
     try:
         current_url = target_page.url.lower()
     except Exception:
         current_url = ""
 
+    if any(hint in current_url for hint in mfa_hints):
+        return True
+
     try:
-        content = (target_page.content() or "").lower()
+        return bool(target_page.evaluate(MARKUP_HINT_PROBE, list(mfa_hints)))
     except Exception:
-        content = ""
-
-    return any(hint in current_url or hint in content for hint in MFA_URL_HINTS + MFA_TEXT_HINTS)
+        return False
 
 
 def page_is_login_page(target_page):
@@ -124,22 +172,38 @@ def page_is_login_page(target_page):
         return False
 
     try:
-        current_url = target_page.url.lower()
+        current_url = target_page.url
     except Exception:
         current_url = ""
 
-    if locator_is_visible(target_page, "input#email") and locator_is_visible(target_page, "input#password"):
+    # The URL is known locally; check it before the locator round trips
+    if is_login_url(current_url):
         return True
 
-    if any(hint in current_url for hint in LOGIN_URL_HINTS):
+    if locator_is_visible(target_page, EMAIL_INPUT_SELECTOR) and locator_is_visible(target_page, PASSWORD_INPUT_SELECTOR):
         return True
 
     try:
-        content = (target_page.content() or "").lower()
+        return bool(target_page.evaluate(LOGIN_MARKUP_PROBE))
     except Exception:
-        content = ""
+        return False
+
 
-    return "member login" in content or ("password" in content and "email address" in content)
+def _login_form_locators(target_page):
+    """Build the sign-in form locators once per page: (email, password, submit)."""
+    return (
+        target_page.locator(EMAIL_INPUT_SELECTOR).first,
+        target_page.locator(PASSWORD_INPUT_SELECTOR).first,
+        target_page.locator(SIGN_IN_BUTTON_SELECTOR).first,
+    )
+
+
+def _wait_for_auth_step(target_page, selectors, timeout_ms):
+    """Wait on AUTH_STEP_PROBE; returns quietly on timeout since callers re-check the page."""
+    try:
+        target_page.wait_for_function(AUTH_STEP_PROBE, arg=", ".join(selectors), timeout=timeout_ms)
+    except Exception:
+        pass
 
 
 def complete_totp_verification(target_page, logger=None, get_totp=None):
@@ -165,7 +229,6 @@ def complete_totp_verification(target_page, logger=None, get_totp=None):
     log.info("  -> Filling authenticator app verification code...")
     try:
         target_page.locator(input_selector).first.fill(verification_code)
-        target_page.wait_for_timeout(300)
     except Exception as exc:
         log.error("Could not fill verification code field: %s", exc)
         return False
@@ -213,11 +276,22 @@ def auto_login(
         return False
 
     log.info("Attempting auto-login to REI Cloud...")
+    email_field, password_field, sign_in_button = _login_form_locators(target_page)
 
     for attempt in range(1, max_attempts + 1):
+        if attempt > 1:
+            # Back off between attempts so a flaky identity provider is not hit back-to-back
+            delay = backoff_delay(attempt - 2)
+            log.info("  Waiting %.1fs before retrying...", delay)
+            time.sleep(delay)
+
         try:
             log.info("  Login attempt %s/%s...", attempt, max_attempts)
-            target_page.wait_for_timeout(3000)
+            _wait_for_auth_step(
+                target_page,
+                [EMAIL_INPUT_SELECTOR] + MFA_EXPLICIT_INPUT_SELECTORS + MFA_FALLBACK_INPUT_SELECTORS,
+                3000,
+            )
 
             if is_authenticated_session(target_page):
                 log.info("Already logged in.")
@@ -228,7 +302,7 @@ def auto_login(
                 if not complete_totp_verification(target_page, logger=log, get_totp=get_totp):
                     return False
                 log.info("  -> Waiting for verification response...")
-                target_page.wait_for_timeout(8000)
+                _wait_for_auth_step(target_page, LOGIN_ERROR_SELECTORS, 8000)
                 if is_authenticated_session(target_page):
                     log.info("Auto-login successful.")
                     return True
@@ -251,7 +325,7 @@ def auto_login(
 
             log.info("  -> Waiting for login form...")
             try:
-                target_page.wait_for_selector("input#email", state="visible", timeout=10000)
+                email_field.wait_for(state="visible", timeout=10000)
             except Exception as exc:
                 log.error("Login form did not appear: %s", exc)
                 if attempt < max_attempts:
@@ -260,36 +334,34 @@ def auto_login(
 
             log.info("  -> Filling in email...")
             try:
-                target_page.locator("input#email").first.fill(username)
-                target_page.wait_for_timeout(500)
+                email_field.fill(username)
             except Exception as exc:
                 log.error("Could not fill email field: %s", exc)
                 return False
 
             log.info("  -> Filling in password...")
             try:
-                target_page.locator("input#password").first.fill(password)
-                target_page.wait_for_timeout(500)
+                password_field.fill(password)
             except Exception as exc:
                 log.error("Could not fill password field: %s", exc)
                 return False
 
             log.info("  -> Clicking 'Sign in' button...")
             try:
-                target_page.locator("button#next").first.click()
+                sign_in_button.click()
             except Exception as exc:
                 log.error("Could not click submit button: %s", exc)
                 return False
 
             log.info("  -> Waiting for response...")
-            target_page.wait_for_timeout(10000)
+            _wait_for_auth_step(target_page, MFA_EXPLICIT_INPUT_SELECTORS + LOGIN_ERROR_SELECTORS, 10000)
 
             if page_requires_totp(target_page):
                 log.info("  -> Authenticator app verification required...")
                 if not complete_totp_verification(target_page, logger=log, get_totp=get_totp):
                     return False
                 log.info("  -> Waiting for verification response...")
-                target_page.wait_for_timeout(8000)
+                _wait_for_auth_step(target_page, LOGIN_ERROR_SELECTORS, 8000)
 
             if is_authenticated_session(target_page):
                 log.info("Auto-login successful.")
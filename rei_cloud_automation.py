@@ -11,9 +11,18 @@ Usage:
 
 import os
 import sys
+import atexit
+import copy
+import functools
 import logging
+import logging.handlers
 import time
+import queue
+import selectors
+import shutil
 import signal
+import socket
+import stat
 import subprocess
 import threading
 import json
@@ -21,12 +30,18 @@ from datetime import datetime, timedelta
 from pathlib import Path
 
 import pytz
-import schedule
-from playwright.sync_api import sync_playwright
 from dotenv import load_dotenv
 
+try:
+    # Faster JSON encoding/decoding for the state file (optional)
+    import orjson
+except ImportError:
+    orjson = None
+
 from rei_auth_flow import (
     auto_login as perform_auto_login,
+    backoff_delay,
+    is_login_url,
     page_is_login_page as detect_login_page,
     page_requires_totp,
 )
@@ -36,7 +51,9 @@ load_dotenv()
 
 # Configuration
 DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", "./downloads"))
-REI_CLOUD_URL = "https://app.reimasterapps.com.au/Customers/Dashboard?reicid=758"
+REI_APP_ORIGIN = "https://app.reimasterapps.com.au"
+REICID = "758"  # REI Cloud customer id carried on every app URL
+REI_CLOUD_URL = f"{REI_APP_ORIGIN}/Customers/Dashboard?reicid={REICID}"
 
 # REI Cloud Credentials (optional - for auto-login)
 REI_USERNAME = os.getenv("REI_USERNAME", "")
@@ -45,16 +62,17 @@ REI_TOTP = os.getenv("REI_TOTP", "")
 
 DOWNLOAD_DIR.mkdir(exist_ok=True)
 
-# Logging
+# Logging (file rotates at ~5 MB, keeping 3 backups)
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
     handlers=[
-        logging.FileHandler("automation.log"),
+        logging.handlers.RotatingFileHandler("automation.log", maxBytes=5_000_000, backupCount=3, delay=True),
         logging.StreamHandler()
     ]
 )
 logger = logging.getLogger(__name__)
+BANNER = "=" * 60
 
 def _missing_booking_extractor(name):
     def _missing(*args, **kwargs):
@@ -86,28 +104,57 @@ else:
         _missing_booking_extractor("run_historical"),
     )
 
+
+def _missing_email_sender(name):
+    def _missing(*args, **kwargs):
+        logger.warning("Notification function '%s' is unavailable (api_email_sender.py). Skipping.", name)
+        return False
+    return _missing
+
+
+try:
+    from api_email_sender import send_failure_alert, send_reports, send_telegram_notification
+except ImportError:
+    logger.warning("Could not import api_email_sender. Email and alert notifications will be disabled.")
+    send_reports = _missing_email_sender("send_reports")
+    send_failure_alert = _missing_email_sender("send_failure_alert")
+    send_telegram_notification = _missing_email_sender("send_telegram_notification")
+
 # Globals
 playwright_instance = None
 browser = None
 context = None
 page = None
+heartbeat_page = None  # Spare tab so keep-alive navigation never disturbs the main page
+headless = False  # Resolved by setup_browser() so recovery relaunches in the same mode
+heartbeat_relogin_failures = 0  # Consecutive heartbeat re-login failures
+heartbeat_relogin_retry_at = 0.0  # time.monotonic() before which heartbeats skip re-login
 
 
 def cleanup(signum=None, frame=None):
     """Clean shutdown."""
     logger.info("\nShutting down...")
+    flush_state()
     try:
         close_browser_context()
-    except:
-        pass
+    except Exception as e:
+        logger.debug(f"Browser close during shutdown failed: {e}")
     sys.exit(0)
 
 
 # State File for tracking successful runs
 STATE_FILE = "automation_state.json"
+_state_cache = None  # ((mtime_ns, size), state) of the state file as last read or written
+_pending_state = None  # Latest saved state not yet flushed to disk
+_state_flush_timer = None
+# Re-entrant: cleanup() flushes from the SIGTERM handler, which may interrupt a holder on this thread
+_state_lock = threading.RLock()
+# Saves within this window are coalesced into one write
+STATE_SAVE_DEBOUNCE_SECONDS = 2.0
 
 # Brisbane timezone for scheduling (handles AEST/AEDT automatically)
-BRISBANE_TZ = pytz.timezone('Australia/Brisbane')
+BRISBANE_TZ_NAME = "Australia/Brisbane"
+BRISBANE_TZ = pytz.timezone(BRISBANE_TZ_NAME)
 
 # Schedule configuration (in Brisbane local time)
 # Daily at 13:00 Brisbane time (handles DST automatically)
@@ -121,14 +168,61 @@ WEEKLY_SCHEDULED_DAY = 5  # Saturday (Monday=0, Sunday=6)
 WEEKLY_SCHEDULED_HOUR = 8
 WEEKLY_SCHEDULED_MINUTE = 0
 WEEKLY_GRACE_PERIOD_MINUTES = 10
+# Wall-clock run times, built once for the schedule helpers
+SCHEDULED_RUN_TIME = datetime.min.time().replace(hour=SCHEDULED_RUN_HOUR, minute=SCHEDULED_RUN_MINUTE)
+WEEKLY_SCHEDULED_TIME = datetime.min.time().replace(hour=WEEKLY_SCHEDULED_HOUR, minute=WEEKLY_SCHEDULED_MINUTE)
 BOOKING_FUTURE_WINDOW_DAYS_BACK = int(os.getenv("BOOKING_FUTURE_WINDOW_DAYS_BACK", "30"))
 BOOKING_FUTURE_WINDOW_DAYS_AHEAD = int(os.getenv("BOOKING_FUTURE_WINDOW_DAYS_AHEAD", "90"))
 BOOKING_FUTURE_WINDOW_OUTPUT = os.getenv("BOOKING_FUTURE_WINDOW_OUTPUT", "all_bookings_future_window.csv")
 APP_DIR = Path(__file__).resolve().parent
 BOOKING_EXTRACTOR_SCRIPT = APP_DIR / "booking_data_extractor.py"
-REPORT_LIST_URL = "https://app.reimasterapps.com.au/report/reportlist?reicid=758"
-LOGIN_URL_HINTS = ("b2clogin", "/login", "/account")
+REPORT_LIST_URL = f"{REI_APP_ORIGIN}/report/reportlist?reicid={REICID}"
+# Report modal / viewer selectors shared by the report download flows
+TOMORROW_OPTION = "text=Tomorrow"
+PREVIEW_BUTTON = "a#btnPreviewBookingDate"
+VISIBLE_EXPORT_BUTTON = "[title='Export']:visible"
+EXPORT_MENU_FALLBACK = "li#trv-main-menu-export-command > a"
+PDF_EXPORT_OPTION = "text=Acrobat (PDF) file"
+CSV_EXPORT_OPTION = "text=CSV (comma delimited)"
+# Test mode re-sends same-day downloads younger than this instead of re-driving the browser
+DAILY_DOWNLOAD_CACHE_MAX_AGE_SECONDS = 6 * 60 * 60
+# Longest the main loop sleeps between passes, so missed-run watchdogs still run promptly
+MAIN_LOOP_MAX_IDLE_SECONDS = 60
+# How long one wait on the trigger socket may hold off the next stdin check
+COMMAND_POLL_SLICE_SECONDS = 0.5
+# Optional: reuse an already-running Chromium (started with --remote-debugging-port)
+BROWSER_CDP_URL = os.getenv("REI_BROWSER_CDP_URL", "")
+BROWSER_PROFILE_DIR = os.path.expanduser("~/.rei-browser-profile")
+# Trim features this automation never uses and cap the on-disk caches so the profile stays small
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--disable-features=Translate,BackForwardCache,AcceptCHFrame,MediaRouter,OptimizationHints",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disk-cache-size=33554432",
+    "--media-cache-size=1",
+    "--no-first-run",
+    "--no-default-browser-check",
+]
+# Regenerable profile caches cleared at startup, before Chromium opens the profile
+PROFILE_PRUNE_DIRS = ("Cache", "Code Cache", "GPUCache", os.path.join("Service Worker", "CacheStorage"))
+# Opt-in true headless Chromium (no xvfb needed); --record always keeps a visible window
+BROWSER_HEADLESS = os.getenv("REI_BROWSER_HEADLESS", "").strip().lower() in ("1", "true", "yes")
+# Images/media/fonts from hosts other than REI and its B2C login are aborted to cut page weight
+BLOCK_THIRD_PARTY_ASSETS = os.getenv("REI_BLOCK_THIRD_PARTY_ASSETS", "true").strip().lower() not in ("0", "false", "no")
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+FIRST_PARTY_HOST_HINTS = ("reimasterapps", "b2clogin")
+# Keep-alive request timeout; the request shares the browser context's cookies
+HEARTBEAT_REQUEST_TIMEOUT_MS = 15000
+# Heartbeat re-login backoff: 30 min after the first failure, doubling up to 4 hours
+HEARTBEAT_RELOGIN_BASE_DELAY_SECONDS = 30 * 60
+HEARTBEAT_RELOGIN_MAX_DELAY_SECONDS = 4 * 60 * 60
+# Page markers waited on after navigation instead of fixed sleeps
+DASHBOARD_MARKER = "text=Dashboard"
+AUTH_PROMPT_SELECTOR = "input#email, input#password, input[autocomplete='one-time-code']"
 PAUSE_FILE = Path(os.getenv("AUTOMATION_PAUSE_FILE", "state/automation.paused"))
+# Optional Unix datagram socket accepting 'run_d' / 'run_w' without a TTY
+TRIGGER_SOCKET_PATH = os.getenv("REI_TRIGGER_SOCKET", "")
 NOTIFICATION_STATE_KEY = "notification_state"
 STARTUP_NOTIFICATION_CATEGORY = "startup"
 MISSED_DAILY_NOTIFICATION_CATEGORY = "missed_daily"
@@ -210,30 +304,68 @@ def has_configured_rei_credentials():
 
 def close_browser_context():
     """Close the current browser context and Playwright runtime if present."""
-    global playwright_instance, browser, context, page
+    global playwright_instance, browser, context, page, heartbeat_page
 
     try:
-        if context:
+        # A CDP-attached browser owns its context; disconnecting below is enough
+        if context and not browser:
             context.close()
     except Exception as exc:
-        logger.debug(f"Error closing browser context: {exc}")
+        logger.debug("Error closing browser context: %s", exc)
 
     try:
         if browser:
             browser.close()
     except Exception as exc:
-        logger.debug(f"Error closing browser: {exc}")
+        logger.debug("Error closing browser: %s", exc)
 
     try:
         if playwright_instance:
             playwright_instance.stop()
     except Exception as exc:
-        logger.debug(f"Error stopping Playwright: {exc}")
+        logger.debug("Error stopping Playwright: %s", exc)
 
     playwright_instance = None
     browser = None
     context = None
     page = None
+    heartbeat_page = None
+
+
+def page_is_responsive(target_page):
+    """Return True if the tab is open and its renderer answers a trivial evaluate."""
+    try:
+        return target_page.evaluate("1") == 1
+    except Exception:
+        return False
+
+
+def acquire_heartbeat_page():
+    """Return the spare heartbeat tab, replacing it if it was closed or hung."""
+    global heartbeat_page
+
+    if heartbeat_page is not None and page_is_responsive(heartbeat_page):
+        return heartbeat_page
+
+    if heartbeat_page is not None:
+        logger.info("Heartbeat tab unresponsive; opening a replacement.")
+        try:
+            heartbeat_page.close()
+        except Exception as exc:
+            logger.debug("Error closing heartbeat tab: %s", exc)
+
+    heartbeat_page = context.new_page()
+    return heartbeat_page
+
+
+def release_heartbeat_page():
+    """Park the spare heartbeat tab on about:blank so the REI page's DOM and scripts are freed until next use."""
+    if heartbeat_page is None:
+        return
+    try:
+        heartbeat_page.goto("about:blank")
+    except Exception as exc:
+        logger.debug("Could not blank heartbeat tab: %s", exc)
 
 
 def _locator_is_visible(target_page, selector):
@@ -247,6 +379,19 @@ def _locator_is_visible(target_page, selector):
         return False
 
 
+def wait_for_page_marker(target_page, selector, timeout=15000):
+    """
+    Wait until selector, or a login prompt if the session has lapsed, is visible.
+    Returns False on timeout instead of raising; callers verify the page afterwards.
+    """
+    try:
+        marker = target_page.locator(selector).or_(target_page.locator(AUTH_PROMPT_SELECTOR))
+        marker.first.wait_for(state="visible", timeout=timeout)
+        return True
+    except Exception:
+        return False
+
+
 def page_is_login_page(target_page):
     """Detect the Azure B2C login page using URL and visible form elements."""
     return detect_login_page(target_page)
@@ -265,7 +410,7 @@ def page_is_dashboard_ready(target_page):
     if "reimasterapps.com.au" not in current_url:
         return False
 
-    return _locator_is_visible(target_page, "text=Dashboard")
+    return _locator_is_visible(target_page, DASHBOARD_MARKER)
 
 
 def page_is_report_list_ready(target_page, report_label="Arrival Report"):
@@ -289,31 +434,107 @@ def page_is_authenticated_session(target_page):
     return page_is_dashboard_ready(target_page) or page_is_report_list_ready(target_page)
 
 
+def connect_browser_over_cdp():
+    """Attach to a long-lived Chromium at REI_BROWSER_CDP_URL. Returns True on success."""
+    global browser, context
+
+    try:
+        browser = playwright_instance.chromium.connect_over_cdp(BROWSER_CDP_URL, timeout=10000)
+    except Exception as exc:
+        logger.warning(f"Could not attach to browser at {BROWSER_CDP_URL} ({exc}); launching a new one.")
+        browser = None
+        return False
+
+    if browser.contexts:
+        context = browser.contexts[0]
+    else:
+        context = browser.new_context(viewport={"width": 1280, "height": 800}, accept_downloads=True)
+    logger.info(f"Attached to running browser at {BROWSER_CDP_URL}")
+    return True
+
+
+def _route_third_party_assets(route):
+    """Abort third-party images, media and fonts; let everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES and not any(
+        hint in request.url for hint in FIRST_PARTY_HOST_HINTS
+    ):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def _enable_http_cache(target_page):
+    """Turn the HTTP cache back on for a tab; Playwright disables it while routes are active."""
+    try:
+        context.new_cdp_session(target_page).send("Network.setCacheDisabled", {"cacheDisabled": False})
+    except Exception as exc:
+        logger.debug("Could not re-enable HTTP cache: %s", exc)
+
+
+def install_resource_blocking():
+    """Route the context through the third-party asset filter, keeping the cache on for every tab."""
+    if not BLOCK_THIRD_PARTY_ASSETS:
+        return
+
+    context.route("**/*", _route_third_party_assets)
+    for existing_page in context.pages:
+        _enable_http_cache(existing_page)
+    context.on("page", _enable_http_cache)
+
+
 def launch_browser_context():
     """Start Playwright and browser with the persistent profile."""
     global playwright_instance, browser, context, page
 
+    # Imported here so the module loads (e.g. for tooling) without the Playwright driver
+    from playwright.sync_api import sync_playwright
+
     playwright_instance = sync_playwright().start()
 
-    user_data_dir = os.path.expanduser("~/.rei-browser-profile")
-    if not os.path.exists(user_data_dir):
-        os.makedirs(user_data_dir)
+    if BROWSER_CDP_URL and connect_browser_over_cdp():
+        page = context.pages[0] if context.pages else context.new_page()
+        install_resource_blocking()
+        return
+
+    if not os.path.exists(BROWSER_PROFILE_DIR):
+        os.makedirs(BROWSER_PROFILE_DIR)
 
-    logger.info(f"Using browser profile: {user_data_dir}")
+    logger.info(f"Using browser profile: {BROWSER_PROFILE_DIR}")
 
     context = playwright_instance.chromium.launch_persistent_context(
-        user_data_dir=user_data_dir,
-        headless=False,
+        user_data_dir=BROWSER_PROFILE_DIR,
+        headless=headless,
         viewport={"width": 1280, "height": 800},
         accept_downloads=True,
-        args=["--disable-blink-features=AutomationControlled"]
+        args=BROWSER_ARGS
     )
 
     page = context.pages[0] if context.pages else context.new_page()
+    install_resource_blocking()
 
 
-def setup_browser():
+def prune_profile():
+    """Delete regenerable cache directories from the persistent profile (cookies and logins are kept)."""
+    default_dir = os.path.join(BROWSER_PROFILE_DIR, "Default")
+    for name in PROFILE_PRUNE_DIRS:
+        path = os.path.join(default_dir, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            logger.debug("Pruned browser profile cache: %s", path)
+
+
+def setup_browser(record_mode=False):
     """Start Playwright and Browser."""
+    global headless
+
+    # Only safe while no Chromium has the profile open, i.e. before the first launch
+    if not BROWSER_CDP_URL:
+        prune_profile()
+
+    headless = BROWSER_HEADLESS and not record_mode
+    if headless:
+        logger.info("Launching browser headless (REI_BROWSER_HEADLESS)")
     launch_browser_context()
 
 
@@ -326,8 +547,8 @@ def recover_session_with_fresh_context(reason, target="dashboard", report_label=
     launch_browser_context()
 
     try:
-        page.goto(REI_CLOUD_URL, timeout=60000)
-        page.wait_for_timeout(3000)
+        page.goto(REI_CLOUD_URL, timeout=60000, wait_until="domcontentloaded")
+        wait_for_page_marker(page, DASHBOARD_MARKER)
     except Exception as nav_error:
         raise RuntimeError(f"Fresh-context navigation to dashboard failed: {nav_error}")
 
@@ -338,16 +559,16 @@ def recover_session_with_fresh_context(reason, target="dashboard", report_label=
         if not auto_login():
             raise RuntimeError("Fresh-context auto-login failed.")
 
-        page.wait_for_timeout(3000)
+        wait_for_page_marker(page, DASHBOARD_MARKER)
 
     if target == "report_list":
-        page.goto(REPORT_LIST_URL, timeout=30000)
-        page.wait_for_timeout(3000)
+        page.goto(REPORT_LIST_URL, timeout=30000, wait_until="domcontentloaded")
+        wait_for_page_marker(page, f"text={report_label}")
         if not page_is_report_list_ready(page, report_label=report_label):
             raise RuntimeError("Fresh-context report list verification failed.")
     else:
-        page.goto(REI_CLOUD_URL, timeout=60000)
-        page.wait_for_timeout(3000)
+        page.goto(REI_CLOUD_URL, timeout=60000, wait_until="domcontentloaded")
+        wait_for_page_marker(page, DASHBOARD_MARKER)
         if not page_is_dashboard_ready(page):
             raise RuntimeError("Fresh-context dashboard verification failed.")
 
@@ -358,12 +579,17 @@ def ensure_dashboard_ready(allow_recovery=True, recovery_reason="dashboard prefl
     """Open the dashboard and verify authenticated access."""
     global page
 
+    # The context is kept across runs; only relaunch it when the tab is gone or hung
+    if page and not page_is_responsive(page):
+        logger.warning("Browser tab is not responding; relaunching the browser context.")
+        close_browser_context()
+
     if not page:
         launch_browser_context()
 
     try:
-        page.goto(REI_CLOUD_URL, timeout=60000)
-        page.wait_for_timeout(3000)
+        page.goto(REI_CLOUD_URL, timeout=60000, wait_until="domcontentloaded")
+        wait_for_page_marker(page, DASHBOARD_MARKER)
     except Exception as nav_error:
         logger.warning(f"Dashboard navigation failed: {nav_error}")
         if allow_recovery:
@@ -393,8 +619,8 @@ def ensure_report_list_ready(report_label="Arrival Report", allow_recovery=True,
         return False
 
     try:
-        page.goto(REPORT_LIST_URL, timeout=30000)
-        page.wait_for_timeout(3000)
+        page.goto(REPORT_LIST_URL, timeout=30000, wait_until="domcontentloaded")
+        wait_for_page_marker(page, f"text={report_label}")
     except Exception as nav_error:
         logger.warning(f"Report list navigation failed: {nav_error}")
         if allow_recovery:
@@ -413,26 +639,84 @@ def ensure_report_list_ready(report_label="Arrival Report", allow_recovery=True,
     return False
 
 
-def load_state():
-    """Load the automation state."""
-    if os.path.exists(STATE_FILE):
+def load_state(readonly=False):
+    """
+    Load the automation state.
+    The parsed file is kept in memory and only re-read when its mtime or size changes,
+    so the main loop's watchdog checks cost a stat() rather than a JSON parse.
+    With readonly, the shared cached dict is returned uncopied and must not be modified.
+    """
+    global _state_cache
+
+    # Callers mutate what they get back; hand out copies so the cache only changes on save
+    share = (lambda state: state) if readonly else copy.deepcopy
+
+    with _state_lock:
+        if _pending_state is not None:
+            return share(_pending_state)
+
         try:
-            with open(STATE_FILE, "r") as f:
-                return json.load(f)
-        except:
-            pass
-    return {}
+            st = os.stat(STATE_FILE)
+        except OSError:
+            return {}
+
+        key = (st.st_mtime_ns, st.st_size)
+        if _state_cache is None or _state_cache[0] != key:
+            try:
+                with open(STATE_FILE, "rb") as f:
+                    raw = f.read()
+                _state_cache = (key, orjson.loads(raw) if orjson else json.loads(raw))
+            except (OSError, ValueError):
+                return {}
+        return share(_state_cache[1])
 
 
 def save_state(state):
-    """Save the automation state."""
-    try:
-        tmp_path = f"{STATE_FILE}.{os.getpid()}.tmp"
-        with open(tmp_path, "w") as f:
-            json.dump(state, f, indent=2)
-        os.replace(tmp_path, STATE_FILE)
-    except Exception as e:
-        logger.error(f"Failed to save state: {e}")
+    """
+    Save the automation state.
+    The write is deferred by STATE_SAVE_DEBOUNCE_SECONDS so back-to-back saves hit
+    the disk once; load_state() sees the new state immediately.
+    """
+    global _pending_state, _state_flush_timer
+
+    with _state_lock:
+        _pending_state = copy.deepcopy(state)
+        if _state_flush_timer is None:
+            _state_flush_timer = threading.Timer(STATE_SAVE_DEBOUNCE_SECONDS, flush_state)
+            _state_flush_timer.daemon = True
+            _state_flush_timer.start()
+
+
+def flush_state():
+    """Write any pending state to disk now: fsync'd temp file, then an atomic rename."""
+    global _state_cache, _pending_state, _state_flush_timer
+
+    with _state_lock:
+        if _state_flush_timer is not None:
+            _state_flush_timer.cancel()
+            _state_flush_timer = None
+        state, _pending_state = _pending_state, None
+        if state is None:
+            return
+
+        try:
+            tmp_path = f"{STATE_FILE}.{os.getpid()}.tmp"
+            if orjson:
+                data = orjson.dumps(state, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(state, indent=2).encode("utf-8")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, STATE_FILE)
+            st = os.stat(STATE_FILE)
+            _state_cache = ((st.st_mtime_ns, st.st_size), state)
+        except Exception as e:
+            logger.error(f"Failed to save state: {e}")
+
+
+atexit.register(flush_state)
 
 
 def current_utc_time():
@@ -469,6 +753,8 @@ def record_notification_if_new(category, token):
         "sent_at": current_utc_time().isoformat(),
     }
     save_state(state)
+    # Write through the save debounce so a crash right after alerting cannot re-alert on restart
+    flush_state()
     return True
 
 
@@ -521,8 +807,9 @@ def should_send_startup_notification():
         logger.info("Skipping startup notification because the automation is paused.")
         return False
 
-    is_past_daily_deadline, _, _ = is_past_deadline()
-    is_past_weekly_deadline_now, _, _ = is_past_weekly_deadline()
+    now = current_utc_time()
+    is_past_daily_deadline, _, _ = is_past_deadline(now)
+    is_past_weekly_deadline_now, _, _ = is_past_weekly_deadline(now)
 
     if is_past_daily_deadline or is_past_weekly_deadline_now:
         logger.info("Skipping startup notification because the automation is already overdue.")
@@ -536,30 +823,44 @@ def should_send_startup_notification():
     return True
 
 
+def _to_brisbane(from_time=None):
+    """Return from_time (naive values are taken as Brisbane-local), or now, as a Brisbane-aware datetime."""
+    if from_time is None:
+        return datetime.now(BRISBANE_TZ)
+    if from_time.tzinfo is None:
+        return BRISBANE_TZ.localize(from_time)
+    return from_time.astimezone(BRISBANE_TZ)
+
+
+def _next_occurrence(after, run_time, weekday=None):
+    """
+    Return the first Brisbane-local run_time (on the given weekday, if any) strictly
+    later than `after`, a Brisbane-aware datetime.
+    """
+    days_ahead = 0 if weekday is None else (weekday - after.weekday()) % 7
+    run_date = after.date() + timedelta(days=days_ahead)
+    candidate = BRISBANE_TZ.localize(datetime.combine(run_date, run_time))
+    if candidate <= after:
+        run_date += timedelta(days=1 if weekday is None else 7)
+        candidate = BRISBANE_TZ.localize(datetime.combine(run_date, run_time))
+    return candidate
+
+
+def _start_of_next_day(brisbane_now):
+    """Return Brisbane-local midnight at the start of the day after brisbane_now."""
+    return BRISBANE_TZ.localize(datetime.combine(brisbane_now.date() + timedelta(days=1), datetime.min.time()))
+
+
 def get_next_scheduled_time(from_time=None):
     """
     Calculate the next scheduled run time (tomorrow at SCHEDULED_RUN_HOUR:SCHEDULED_RUN_MINUTE Brisbane time).
     Returns ISO format string in UTC for storage.
     """
-    # Use current time in Brisbane timezone
-    if from_time is None:
-        brisbane_now = datetime.now(BRISBANE_TZ)
-    else:
-        # Ensure from_time is timezone-aware in Brisbane
-        if from_time.tzinfo is None:
-            brisbane_now = BRISBANE_TZ.localize(from_time)
-        else:
-            brisbane_now = from_time.astimezone(BRISBANE_TZ)
-    
-    # Next run is tomorrow at the scheduled time (Brisbane time)
-    tomorrow = brisbane_now.date() + timedelta(days=1)
-    next_run_brisbane = BRISBANE_TZ.localize(datetime.combine(tomorrow, datetime.min.time().replace(
-        hour=SCHEDULED_RUN_HOUR, minute=SCHEDULED_RUN_MINUTE
-    )))
+    # A run today satisfies today's slot, so the next one is due tomorrow
+    next_run_brisbane = _next_occurrence(_start_of_next_day(_to_brisbane(from_time)), SCHEDULED_RUN_TIME)
     
     # Convert to UTC for storage
-    next_run_utc = next_run_brisbane.astimezone(pytz.UTC)
-    return next_run_utc.isoformat()
+    return next_run_brisbane.astimezone(pytz.UTC).isoformat()
 
 
 def get_next_weekly_scheduled_time(from_time=None):
@@ -567,29 +868,13 @@ def get_next_weekly_scheduled_time(from_time=None):
     Calculate the next weekly scheduled run time (next Saturday at 08:00 Brisbane time).
     Returns ISO format string in UTC for storage.
     """
-    # Use current time in Brisbane timezone
-    if from_time is None:
-        brisbane_now = datetime.now(BRISBANE_TZ)
-    else:
-        # Ensure from_time is timezone-aware in Brisbane
-        if from_time.tzinfo is None:
-            brisbane_now = BRISBANE_TZ.localize(from_time)
-        else:
-            brisbane_now = from_time.astimezone(BRISBANE_TZ)
-    
-    # Find days until next Saturday
-    days_ahead = WEEKLY_SCHEDULED_DAY - brisbane_now.weekday()
-    if days_ahead <= 0:  # Target day already passed this week
-        days_ahead += 7
-    
-    next_saturday = brisbane_now.date() + timedelta(days=days_ahead)
-    next_run_brisbane = BRISBANE_TZ.localize(datetime.combine(next_saturday, datetime.min.time().replace(
-        hour=WEEKLY_SCHEDULED_HOUR, minute=WEEKLY_SCHEDULED_MINUTE
-    )))
+    # A run today satisfies today's slot, so the next one is due after today
+    next_run_brisbane = _next_occurrence(
+        _start_of_next_day(_to_brisbane(from_time)), WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY
+    )
     
     # Convert to UTC for storage
-    next_run_utc = next_run_brisbane.astimezone(pytz.UTC)
-    return next_run_utc.isoformat()
+    return next_run_brisbane.astimezone(pytz.UTC).isoformat()
 
 
 def save_successful_run():
@@ -620,12 +905,15 @@ def save_successful_weekly_run():
 
 def init_state_if_needed():
     """
-    Initialize state on startup if next_expected_run is missing.
+    Initialize state on startup if next_expected_run or next_expected_weekly_run is missing.
     Also migrates legacy 'last_run_date' to new format.
-    Sets next_expected_run to today's scheduled time if before that time,
-    or tomorrow if after (all in Brisbane timezone).
+    Sets next_expected_run to today's scheduled time if before that time, or tomorrow if after,
+    and next_expected_weekly_run to this Saturday or next (all in Brisbane timezone).
+    The state is loaded and written at most once.
     """
     state = load_state()
+    changed = False
+    now = datetime.now(BRISBANE_TZ)
     
     # Migrate legacy state: convert last_run_date to last_successful_run
     if "last_run_date" in state and "last_successful_run" not in state:
@@ -635,72 +923,50 @@ def init_state_if_needed():
             migrated_time = BRISBANE_TZ.localize(old_date.replace(hour=SCHEDULED_RUN_HOUR, minute=SCHEDULED_RUN_MINUTE))
             state["last_successful_run"] = migrated_time.astimezone(pytz.UTC).isoformat()
             del state["last_run_date"]  # Remove legacy field
+            changed = True
             logger.info(f"Migrated legacy state: last_run_date -> last_successful_run={state['last_successful_run']}")
         except Exception as e:
             logger.error(f"Failed to migrate legacy state: {e}")
     
     if "next_expected_run" not in state:
-        # Use Brisbane timezone for scheduling logic
-        brisbane_now = datetime.now(BRISBANE_TZ)
-        today_scheduled = BRISBANE_TZ.localize(datetime.combine(brisbane_now.date(), datetime.min.time().replace(
-            hour=SCHEDULED_RUN_HOUR, minute=SCHEDULED_RUN_MINUTE
-        )))
-        
-        if brisbane_now < today_scheduled:
-            # Before today's run time - set deadline to today (store in UTC)
-            state["next_expected_run"] = today_scheduled.astimezone(pytz.UTC).isoformat()
-        else:
-            # After today's run time - set deadline to tomorrow
-            state["next_expected_run"] = get_next_scheduled_time(brisbane_now)
-        
-        save_state(state)
+        # Today's run time if it is still ahead, otherwise tomorrow's (stored in UTC)
+        next_run = _next_occurrence(now, SCHEDULED_RUN_TIME)
+        state["next_expected_run"] = next_run.astimezone(pytz.UTC).isoformat()
+        changed = True
         logger.info(f"Initialized state with next_expected_run={state['next_expected_run']}")
     
+    if "next_expected_weekly_run" not in state:
+        # This Saturday's run time if it is still ahead, otherwise next Saturday's (stored in UTC)
+        next_run = _next_occurrence(now, WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY)
+        state["next_expected_weekly_run"] = next_run.astimezone(pytz.UTC).isoformat()
+        changed = True
+        logger.info(f"Initialized weekly state with next_expected_weekly_run={state['next_expected_weekly_run']}")
+    
+    if changed:
+        save_state(state)
+    
     return state
 
 
-def init_weekly_state_if_needed():
+@functools.lru_cache(maxsize=16)
+def parse_state_timestamp(value):
     """
-    Initialize weekly state on startup if next_expected_weekly_run is missing.
-    Sets next_expected_weekly_run to this Saturday if before that time,
-    or next Saturday if after (all in Brisbane timezone).
+    Parse an ISO timestamp from the state file as a UTC-aware datetime (naive values are
+    treated as UTC). Memoized: the stored values only change when a run is recorded.
     """
-    state = load_state()
-    
-    if "next_expected_weekly_run" not in state:
-        # Use Brisbane timezone for scheduling logic
-        brisbane_now = datetime.now(BRISBANE_TZ)
-        
-        # Calculate this Saturday
-        days_until_saturday = WEEKLY_SCHEDULED_DAY - brisbane_now.weekday()
-        if days_until_saturday < 0:  
-            days_until_saturday += 7
-        
-        this_saturday = brisbane_now.date() + timedelta(days=days_until_saturday)
-        this_saturday_scheduled = BRISBANE_TZ.localize(datetime.combine(this_saturday, datetime.min.time().replace(
-            hour=WEEKLY_SCHEDULED_HOUR, minute=WEEKLY_SCHEDULED_MINUTE
-        )))
-        
-        if brisbane_now < this_saturday_scheduled:
-            # Before this Saturday's run time - set deadline to this Saturday (store in UTC)
-            state["next_expected_weekly_run"] = this_saturday_scheduled.astimezone(pytz.UTC).isoformat()
-        else:
-            # After this Saturday's run time - set deadline to next Saturday
-            state["next_expected_weekly_run"] = get_next_weekly_scheduled_time(brisbane_now)
-        
-        save_state(state)
-        logger.info(f"Initialized weekly state with next_expected_weekly_run={state['next_expected_weekly_run']}")
-    
-    return state
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = pytz.UTC.localize(parsed)
+    return parsed
 
 
-def is_past_deadline():
+def is_past_deadline(now=None):
     """
     Check if current time is past the deadline (next_expected_run + grace period).
     Returns (is_past, next_expected_run_dt, last_successful_run_dt)
-    All comparisons done in UTC timezone.
+    All comparisons done in UTC timezone; now (aware UTC) defaults to the current time.
     """
-    state = load_state()
+    state = load_state(readonly=True)
     next_run_str = state.get("next_expected_run")
     last_success_str = state.get("last_successful_run")
     
@@ -708,19 +974,13 @@ def is_past_deadline():
         return False, None, None
     
     try:
-        next_run_dt = datetime.fromisoformat(next_run_str)
-        # Ensure timezone-aware (assume UTC if no timezone)
-        if next_run_dt.tzinfo is None:
-            next_run_dt = pytz.UTC.localize(next_run_dt)
+        next_run_dt = parse_state_timestamp(next_run_str)
         deadline = next_run_dt + timedelta(minutes=GRACE_PERIOD_MINUTES)
         
-        last_success_dt = None
-        if last_success_str:
-            last_success_dt = datetime.fromisoformat(last_success_str)
-            if last_success_dt.tzinfo is None:
-                last_success_dt = pytz.UTC.localize(last_success_dt)
+        last_success_dt = parse_state_timestamp(last_success_str) if last_success_str else None
         
-        now = current_utc_time()  # Use UTC for comparison
+        if now is None:
+            now = current_utc_time()  # Use UTC for comparison
         is_past = now > deadline
         
         return is_past, next_run_dt, last_success_dt
@@ -729,13 +989,13 @@ def is_past_deadline():
         return False, None, None
 
 
-def is_past_weekly_deadline():
+def is_past_weekly_deadline(now=None):
     """
     Check if current time is past the weekly deadline (next_expected_weekly_run + grace period).
     Returns (is_past, next_expected_run_dt, last_successful_run_dt)
-    All comparisons done in UTC timezone.
+    All comparisons done in UTC timezone; now (aware UTC) defaults to the current time.
     """
-    state = load_state()
+    state = load_state(readonly=True)
     next_run_str = state.get("next_expected_weekly_run")
     last_success_str = state.get("last_successful_weekly_run")
     
@@ -743,19 +1003,13 @@ def is_past_weekly_deadline():
         return False, None, None
     
     try:
-        next_run_dt = datetime.fromisoformat(next_run_str)
-        # Ensure timezone-aware (assume UTC if no timezone)
-        if next_run_dt.tzinfo is None:
-            next_run_dt = pytz.UTC.localize(next_run_dt)
+        next_run_dt = parse_state_timestamp(next_run_str)
         deadline = next_run_dt + timedelta(minutes=WEEKLY_GRACE_PERIOD_MINUTES)
         
-        last_success_dt = None
-        if last_success_str:
-            last_success_dt = datetime.fromisoformat(last_success_str)
-            if last_success_dt.tzinfo is None:
-                last_success_dt = pytz.UTC.localize(last_success_dt)
+        last_success_dt = parse_state_timestamp(last_success_str) if last_success_str else None
         
-        now = current_utc_time()  # Use UTC for comparison
+        if now is None:
+            now = current_utc_time()  # Use UTC for comparison
         is_past = now > deadline
         
         return is_past, next_run_dt, last_success_dt
@@ -795,217 +1049,240 @@ def configure_report_options(target_page):
                         logger.info(f"  ✓ {status} (fallback): {option_id}")
                 else:
                     status = "already hidden" if should_hide else "already shown"
-                    logger.info(f"  - {option_id} {status}")
+                    logger.info("  - %s %s", option_id, status)
             else:
                 logger.warning(f"  Option not found: #{option_id}")
         except Exception as e:
             logger.warning(f"  Could not set #{option_id}: {e}")
-    
-    target_page.wait_for_timeout(500)
 
 
-def run_daily_report():
-    """Execute the daily report workflow: Arrivals and Departures for tomorrow."""
+def cached_daily_downloads(stamp, max_age_seconds=DAILY_DOWNLOAD_CACHE_MAX_AGE_SECONDS):
+    """
+    Return the (arrivals_pdf, arrivals_csv, departures_pdf, departures_csv) saved under
+    the given date stamp if all four were downloaded within max_age_seconds, else None.
+    """
+    paths = [
+        str(DOWNLOAD_DIR / f"{kind}_{stamp}.{ext}")
+        for kind in ("arrivals", "departures")
+        for ext in ("pdf", "csv")
+    ]
+    now = time.time()
+    for path in paths:
+        try:
+            if now - os.stat(path).st_mtime > max_age_seconds:
+                return None
+        except OSError:
+            return None
+    return tuple(paths)
+
+
+def _click_visible_export(report_page, export_button):
+    """Open the report viewer's Export menu using whichever Export button is visible."""
+    # The viewer renders top and bottom toolbars; :visible lets the browser pick in one call
+    try:
+        export_button.click(timeout=10000)
+    except Exception as e:
+        logger.warning(f"No visible export button ({e}), falling back to the toolbar menu item...")
+        report_page.click(EXPORT_MENU_FALLBACK, force=True)
+
+
+def _export_report(report_page, export_button, format_option, dest_path):
+    """
+    Open the viewer's Export menu, pick a format locator and save the download to dest_path.
+    If the menu is still open from the previous export it is reused rather than reopened.
+    """
+    try:
+        menu_open = format_option.is_visible()
+    except Exception:
+        menu_open = False
+    if not menu_open:
+        _click_visible_export(report_page, export_button)
+    with report_page.expect_download() as download_info:
+        format_option.click()
+    download_info.value.save_as(dest_path)
+    return dest_path
+
+
+def _select_tomorrow(target_page):
+    """Choose 'Tomorrow' in the report options modal."""
+    target_page.click(TOMORROW_OPTION)
+
+
+def _select_next_7_days(target_page):
+    """Choose 'Next 7 Days' in the report options modal (an iCheck radio)."""
+    try:
+        target_page.evaluate("document.querySelector('#bookingNext7').parentNode.querySelector('.iCheck-helper').click()")
+    except Exception:
+        target_page.click("label[for='bookingNext7']", force=True)
+
+
+def _return_to_report_list(report_label):
+    """
+    Reuse the report list that is still open behind the options modal instead of
+    reloading it. Returns False if the page has moved on or the modal will not close.
+    """
+    global page
+
+    try:
+        page.bring_to_front()
+        if "reportlist" not in page.url.lower():
+            return False
+        page.keyboard.press("Escape")
+        page.locator(PREVIEW_BUTTON).wait_for(state="hidden", timeout=5000)
+        page.locator(f"text={report_label}").wait_for(state="visible", timeout=5000)
+        return True
+    except Exception as e:
+        logger.info(f"Report list not reusable ({e}), reloading it...")
+        return False
+
+
+def _open_report_preview(kind, select_range, range_label, run_label, reuse_report_list=False):
+    """
+    Generate an Arrival or Departure report for the range chosen by select_range and
+    return its preview tab. The tab is returned as soon as it opens so the server can
+    render it while the next report is being set up.
+    With reuse_report_list, the already-open report list is used when still available.
+    """
     global page, context
-    
-    logger.info("=" * 60)
-    logger.info(f"RUNNING DAILY REPORT - {datetime.now()}")
-    logger.info("=" * 60)
-    
+
+    label = f"{kind} Report"
+
+    if reuse_report_list and _return_to_report_list(label):
+        logger.info(f"Reusing the open report list for {label}")
+    elif not ensure_report_list_ready(report_label=label, recovery_reason=f"{run_label} {kind.lower()} preflight"):
+        raise RuntimeError(f"{run_label.capitalize()} preflight failed before {label} was available.")
+
+    logger.info(f"Generating {label} for {range_label}...")
+
+    # Click on the report link
     try:
-        if not ensure_report_list_ready(report_label="Arrival Report", recovery_reason="daily report preflight"):
-            raise RuntimeError("Daily report preflight failed before Arrival Report was available.")
-        
-        # ===== ARRIVAL REPORT =====
-        logger.info("Generating Arrival Report for tomorrow...")
-        
-        # Click on Arrival Report
-        try:
-            page.click("text=Arrival Report", timeout=5000)
-        except:
-            logger.info("Retry clicking Arrival Report...")
-            page.goto(REPORT_LIST_URL)
-            page.wait_for_timeout(3000)
-            page.click("text=Arrival Report")
-            
-        page.wait_for_timeout(2000)
-        
-        # Configure hide options
-        logger.info("Configuring report options (Hide toggles)...")
-        configure_report_options(page)
-        
-        # Select Tomorrow in the popup
-        logger.info("Selecting 'Tomorrow' for reports...")
-        page.click("text=Tomorrow")
-        page.wait_for_timeout(1000)
-        
-        # Click Preview button - this opens a new tab
-        # Using exact ID found via inspection
-        with context.expect_page() as new_page_info:
-            page.click("a#btnPreviewBookingDate")
-        report_page = new_page_info.value
-        report_page.wait_for_load_state("networkidle")
-        logger.info("Report preview opened in new tab")
-        
-        # Click the save/export dropdown (the download icon)
-        report_page.wait_for_timeout(2000)
-        
-        # Click the export dropdown button
-        # There are often two (top/bottom), find the visible one
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            count = export_btns.count()
-            export_clicked = False
-            
-            for i in range(count):
-                if export_btns.nth(i).is_visible():
-                    logger.info("Found visible export button, clicking...")
-                    export_btns.nth(i).click()
-                    export_clicked = True
-                    break
-            
-            if not export_clicked:
-                logger.warning("No visible export button found, attempting force click on first...")
-                export_btns.first.click(force=True)
-                
-        except Exception as e:
-            logger.error(f"Error clicking export button: {e}")
-            # Try specific ID as fallback
-            report_page.click("li#trv-main-menu-export-command > a", force=True)
-
-        # Download PDF
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=Acrobat (PDF) file")
-        download = download_info.value
-        arrivals_pdf = str(DOWNLOAD_DIR / f"arrivals_{datetime.now().strftime('%Y%m%d')}.pdf")
-        download.save_as(arrivals_pdf)
-        logger.info(f"✓ Saved Arrival Report (PDF): {arrivals_pdf}")
-        
-        # Re-click export for CSV
-        report_page.wait_for_timeout(1000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-        except:
-            report_page.click("[title='Export']", force=True)
-        
-        # Download CSV
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=CSV (comma delimited)")
-        download = download_info.value
-        arrivals_csv = str(DOWNLOAD_DIR / f"arrivals_{datetime.now().strftime('%Y%m%d')}.csv")
-        download.save_as(arrivals_csv)
-        logger.info(f"✓ Saved Arrival Report (CSV): {arrivals_csv}")
-        
-        # Close the report tab
-        report_page.close()
-        page.wait_for_timeout(2000)
-        
-        # Go back to Report List
-        if not ensure_report_list_ready(report_label="Departure Report", recovery_reason="daily report departure preflight"):
-            raise RuntimeError("Daily report preflight failed before Departure Report was available.")
-        
-        # ===== DEPARTURE REPORT =====
-        logger.info("Generating Departure Report for tomorrow...")
-        
-        # Click on Departure Report
-        page.click("text=Departure Report")
-        page.wait_for_timeout(2000)
-        
-        # Configure hide options
-        logger.info("Configuring report options (Hide toggles)...")
-        configure_report_options(page)
-        
-        # Select Tomorrow in the popup
-        page.click("text=Tomorrow")
-        page.wait_for_timeout(1000)
-        
-        # Click Preview button - this opens a new tab
-        with context.expect_page() as new_page_info:
-            page.click("a#btnPreviewBookingDate")
-        report_page = new_page_info.value
+        page.click(f"text={label}", timeout=5000)
+    except Exception:
+        logger.info(f"Retry clicking {label}...")
+        page.goto(REPORT_LIST_URL, wait_until="domcontentloaded")
+        wait_for_page_marker(page, f"text={label}")
+        page.click(f"text={label}")
+
+    # The options modal is ready once its date choices render
+    page.wait_for_selector(TOMORROW_OPTION, state="visible", timeout=10000)
+
+    # Configure hide options
+    logger.info("Configuring report options (Hide toggles)...")
+    configure_report_options(page)
+
+    # Select the date range in the popup
+    logger.info(f"Selecting '{range_label}' for reports...")
+    select_range(page)
+    page.wait_for_selector(PREVIEW_BUTTON, state="visible", timeout=10000)
+
+    # Click Preview button - this opens a new tab
+    with context.expect_page() as new_page_info:
+        page.click(PREVIEW_BUTTON)
+    logger.info("Report preview opened in new tab")
+    return new_page_info.value
+
+
+def _export_report_preview(kind, report_page, file_prefix, stamp):
+    """
+    Save an opened Arrival or Departure preview as PDF and CSV, then close it.
+    Returns (pdf_path, csv_path).
+    """
+    label = f"{kind} Report"
+    base_name = f"{file_prefix}{'arrivals' if kind == 'Arrival' else 'departures'}_{stamp}"
+
+    try:
+        # Build the viewer locators once and reuse them for both exports
+        export_button = report_page.locator(VISIBLE_EXPORT_BUTTON).first
+        # text= also matches hidden duplicates in the viewer's menus; take the first visible one
+        pdf_option = report_page.locator(f"{PDF_EXPORT_OPTION} >> visible=true").first
+        csv_option = report_page.locator(f"{CSV_EXPORT_OPTION} >> visible=true").first
+
         report_page.wait_for_load_state("networkidle")
-        logger.info("Report preview opened in new tab")
-        
-        # Click the save/export dropdown
-        report_page.wait_for_timeout(2000)
-        
-        # Click the export dropdown button (Departure)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            count = export_btns.count()
-            export_clicked = False
-            
-            for i in range(count):
-                if export_btns.nth(i).is_visible():
-                    logger.info("Found visible export button, clicking...")
-                    export_btns.nth(i).click()
-                    export_clicked = True
-                    break
-            
-            if not export_clicked:
-                logger.warning("No visible export button found, attempting force click on first...")
-                export_btns.first.click(force=True)
-                
-        except Exception as e:
-            logger.error(f"Error clicking export button: {e}")
-            report_page.click("li#trv-main-menu-export-command > a", force=True)
-
-        # Download PDF
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=Acrobat (PDF) file")
-        download = download_info.value
-        departures_pdf = str(DOWNLOAD_DIR / f"departures_{datetime.now().strftime('%Y%m%d')}.pdf")
-        download.save_as(departures_pdf)
-        logger.info(f"✓ Saved Departure Report (PDF): {departures_pdf}")
-        
-        # Re-click export for CSV
-        report_page.wait_for_timeout(1000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-        except:
-            report_page.click("[title='Export']", force=True)
-        
-        # Download CSV
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=CSV (comma delimited)")
-        download = download_info.value
-        departures_csv = str(DOWNLOAD_DIR / f"departures_{datetime.now().strftime('%Y%m%d')}.csv")
-        download.save_as(departures_csv)
-        logger.info(f"✓ Saved Departure Report (CSV): {departures_csv}")
-        
+
+        # Export once the viewer toolbar is up
+        export_button.wait_for(state="visible", timeout=30000)
+
+        pdf_path = _export_report(report_page, export_button, pdf_option, str(DOWNLOAD_DIR / f"{base_name}.pdf"))
+        logger.info("✓ Saved %s (PDF): %s", label, pdf_path)
+
+        csv_path = _export_report(report_page, export_button, csv_option, str(DOWNLOAD_DIR / f"{base_name}.csv"))
+        logger.info("✓ Saved %s (CSV): %s", label, csv_path)
+    finally:
         # Close the report tab
         report_page.close()
+    return pdf_path, csv_path
+
+
+def _download_reports(select_range, range_label, run_label, file_prefix, stamp):
+    """
+    Download the Arrival and Departure reports for one date range as PDF and CSV.
+    Both previews are opened before either is exported so the server renders them
+    side by side. Returns (arrivals_pdf, arrivals_csv, departures_pdf, departures_csv).
+    """
+    arrivals_preview = _open_report_preview("Arrival", select_range, range_label, run_label)
+    try:
+        departures_preview = _open_report_preview("Departure", select_range, range_label, run_label, reuse_report_list=True)
+    except Exception:
+        arrivals_preview.close()
+        raise
+    try:
+        # A session recovery during the Departure preflight recycles the context and
+        # takes the Arrival tab with it; generate that preview again in the new context
+        if arrivals_preview.is_closed():
+            logger.info("Arrival preview was closed by session recovery; opening it again...")
+            arrivals_preview = _open_report_preview("Arrival", select_range, range_label, run_label, reuse_report_list=True)
+    except Exception:
+        departures_preview.close()
+        raise
+    try:
+        arrivals_pdf, arrivals_csv = _export_report_preview("Arrival", arrivals_preview, file_prefix, stamp)
+    except Exception:
+        departures_preview.close()
+        raise
+    departures_pdf, departures_csv = _export_report_preview("Departure", departures_preview, file_prefix, stamp)
+    return arrivals_pdf, arrivals_csv, departures_pdf, departures_csv
+
+
+def run_daily_report(use_cache=False):
+    """
+    Execute the daily report workflow: Arrivals and Departures for tomorrow.
+    With use_cache, today's already-downloaded reports are re-sent if still fresh.
+    """
+    global page, context
+    
+    started = datetime.now()
+    stamp = started.strftime('%Y%m%d')
+    logger.info(BANNER)
+    logger.info(f"RUNNING DAILY REPORT - {started}")
+    logger.info(BANNER)
+    
+    try:
+        cached = cached_daily_downloads(stamp) if use_cache else None
+        if cached:
+            arrivals_pdf, arrivals_csv, departures_pdf, departures_csv = cached
+            logger.info("Reusing today's downloaded reports; skipping the browser run:")
+            for path in cached:
+                logger.info("  - %s", path)
+        else:
+            arrivals_pdf, arrivals_csv, departures_pdf, departures_csv = _download_reports(
+                _select_tomorrow, "Tomorrow", "daily report", "", stamp
+            )
         
-        logger.info("=" * 60)
-        logger.info("✓ Daily reports complete!")
-        logger.info(f"  - {arrivals_pdf}")
-        logger.info(f"  - {arrivals_csv}")
-        logger.info(f"  - {departures_pdf}")
-        logger.info(f"  - {departures_csv}")
-        logger.info("=" * 60)
+            logger.info(BANNER)
+            logger.info("✓ Daily reports complete!")
+            logger.info("  - %s", arrivals_pdf)
+            logger.info("  - %s", arrivals_csv)
+            logger.info("  - %s", departures_pdf)
+            logger.info("  - %s", departures_csv)
+            logger.info(BANNER)
         
         # Send reports via API email
         try:
-            from api_email_sender import send_reports
             logger.info("Sending reports via email API...")
             if send_reports(arrivals_pdf, departures_pdf, arrivals_csv, departures_csv):
                 logger.info("✓ Email sent successfully!")
             else:
                 logger.warning("Email sending failed or not configured.")
-        except ImportError:
-            logger.info("Email API not configured (api_email_sender.py). Skipping email.")
         except Exception as e:
             logger.error(f"Email error: {e}")
             
@@ -1025,7 +1302,6 @@ def run_daily_report():
             
         # Send Failure Alert (SMS/Telegram)
         try:
-            from api_email_sender import send_failure_alert
             send_failure_alert(error_details)
         except Exception as alert_err:
             logger.error(f"Failed to send failure alert: {alert_err}")
@@ -1035,196 +1311,27 @@ def run_weekly_report():
     """Execute the weekly report workflow: Arrivals and Departures for next 7 days."""
     global page, context
     
-    logger.info("=" * 60)
-    logger.info(f"RUNNING WEEKLY REPORT - {datetime.now()}")
-    logger.info("=" * 60)
+    started = datetime.now()
+    stamp = started.strftime('%Y%m%d')
+    logger.info(BANNER)
+    logger.info(f"RUNNING WEEKLY REPORT - {started}")
+    logger.info(BANNER)
     
     try:
-        if not ensure_report_list_ready(report_label="Arrival Report", recovery_reason="weekly report preflight"):
-            raise RuntimeError("Weekly report preflight failed before Arrival Report was available.")
-        
-        # ===== ARRIVAL REPORT (WEEKLY) =====
-        logger.info("Generating Arrival Report for next 7 days...")
-        
-        # Click on Arrival Report
-        try:
-            page.click("text=Arrival Report", timeout=5000)
-        except:
-            logger.info("Retry clicking Arrival Report...")
-            page.goto(REPORT_LIST_URL)
-            page.wait_for_timeout(3000)
-            page.click("text=Arrival Report")
-            
-        page.wait_for_timeout(2000)
-        
-        # Configure hide options
-        logger.info("Configuring report options (Hide toggles)...")
-        configure_report_options(page)
-        
-        # Select Next 7 Days
-        logger.info("Selecting 'Next 7 Days' for reports...")
-        try:
-            page.evaluate("document.querySelector('#bookingNext7').parentNode.querySelector('.iCheck-helper').click()")
-        except:
-            page.click("label[for='bookingNext7']", force=True)
-        page.wait_for_timeout(1000)
-        
-        # Click Preview button - this opens a new tab
-        with context.expect_page() as new_page_info:
-            page.click("a#btnPreviewBookingDate")
-        report_page = new_page_info.value
-        report_page.wait_for_load_state("networkidle")
-        logger.info("Report preview opened in new tab")
-        
-        # Click the export dropdown button
-        report_page.wait_for_timeout(2000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            count = export_btns.count()
-            export_clicked = False
-            
-            for i in range(count):
-                if export_btns.nth(i).is_visible():
-                    logger.info("Found visible export button, clicking...")
-                    export_btns.nth(i).click()
-                    export_clicked = True
-                    break
-            
-            if not export_clicked:
-                logger.warning("No visible export button found, attempting force click on first...")
-                export_btns.first.click(force=True)
-                
-        except Exception as e:
-            logger.error(f"Error clicking export button: {e}")
-            report_page.click("li#trv-main-menu-export-command > a", force=True)
-
-        # Download PDF
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=Acrobat (PDF) file")
-        download = download_info.value
-        arrivals_pdf = str(DOWNLOAD_DIR / f"weekly_arrivals_{datetime.now().strftime('%Y%m%d')}.pdf")
-        download.save_as(arrivals_pdf)
-        logger.info(f"✓ Saved Weekly Arrival Report (PDF): {arrivals_pdf}")
-        
-        # Re-click export for CSV
-        report_page.wait_for_timeout(1000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-        except:
-            report_page.click("[title='Export']", force=True)
-        
-        # Download CSV
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=CSV (comma delimited)")
-        download = download_info.value
-        arrivals_csv = str(DOWNLOAD_DIR / f"weekly_arrivals_{datetime.now().strftime('%Y%m%d')}.csv")
-        download.save_as(arrivals_csv)
-        logger.info(f"✓ Saved Weekly Arrival Report (CSV): {arrivals_csv}")
-        
-        # Close the report tab
-        report_page.close()
-        page.wait_for_timeout(2000)
-        
-        # Go back to Report List
-        if not ensure_report_list_ready(report_label="Departure Report", recovery_reason="weekly report departure preflight"):
-            raise RuntimeError("Weekly report preflight failed before Departure Report was available.")
-        
-        # ===== DEPARTURE REPORT (WEEKLY) =====
-        logger.info("Generating Departure Report for next 7 days...")
-        
-        # Click on Departure Report
-        page.click("text=Departure Report")
-        page.wait_for_timeout(2000)
-        
-        # Configure hide options
-        logger.info("Configuring report options (Hide toggles)...")
-        configure_report_options(page)
-        
-        # Select Next 7 Days
-        try:
-            page.evaluate("document.querySelector('#bookingNext7').parentNode.querySelector('.iCheck-helper').click()")
-        except:
-            page.click("label[for='bookingNext7']", force=True)
-        page.wait_for_timeout(1000)
-        
-        # Click Preview button - this opens a new tab
-        with context.expect_page() as new_page_info:
-            page.click("a#btnPreviewBookingDate")
-        report_page = new_page_info.value
-        report_page.wait_for_load_state("networkidle")
-        logger.info("Report preview opened in new tab")
-        
-        # Click the export dropdown button
-        report_page.wait_for_timeout(2000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            count = export_btns.count()
-            export_clicked = False
-            
-            for i in range(count):
-                if export_btns.nth(i).is_visible():
-                    logger.info("Found visible export button, clicking...")
-                    export_btns.nth(i).click()
-                    export_clicked = True
-                    break
-            
-            if not export_clicked:
-                logger.warning("No visible export button found, attempting force click on first...")
-                export_btns.first.click(force=True)
-                
-        except Exception as e:
-            logger.error(f"Error clicking export button: {e}")
-            report_page.click("li#trv-main-menu-export-command > a", force=True)
-
-        # Download PDF
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=Acrobat (PDF) file")
-        download = download_info.value
-        departures_pdf = str(DOWNLOAD_DIR / f"weekly_departures_{datetime.now().strftime('%Y%m%d')}.pdf")
-        download.save_as(departures_pdf)
-        logger.info(f"✓ Saved Weekly Departure Report (PDF): {departures_pdf}")
-        
-        # Re-click export for CSV
-        report_page.wait_for_timeout(1000)
-        try:
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-        except:
-            report_page.click("[title='Export']", force=True)
-        
-        # Download CSV
-        with report_page.expect_download() as download_info:
-            report_page.wait_for_timeout(500)
-            report_page.click("text=CSV (comma delimited)")
-        download = download_info.value
-        departures_csv = str(DOWNLOAD_DIR / f"weekly_departures_{datetime.now().strftime('%Y%m%d')}.csv")
-        download.save_as(departures_csv)
-        logger.info(f"✓ Saved Weekly Departure Report (CSV): {departures_csv}")
-        
-        # Close the report tab
-        report_page.close()
+        arrivals_pdf, arrivals_csv, departures_pdf, departures_csv = _download_reports(
+            _select_next_7_days, "Next 7 Days", "weekly report", "weekly_", stamp
+        )
         
-        logger.info("=" * 60)
+        logger.info(BANNER)
         logger.info("✓ Weekly reports complete!")
-        logger.info(f"  - {arrivals_pdf}")
-        logger.info(f"  - {arrivals_csv}")
-        logger.info(f"  - {departures_pdf}")
-        logger.info(f"  - {departures_csv}")
-        logger.info("=" * 60)
+        logger.info("  - %s", arrivals_pdf)
+        logger.info("  - %s", arrivals_csv)
+        logger.info("  - %s", departures_pdf)
+        logger.info("  - %s", departures_csv)
+        logger.info(BANNER)
         
         # Send reports via API email (reusing daily email function)
         try:
-            from api_email_sender import send_reports
             logger.info("Sending weekly reports via email API...")
             if send_reports(arrivals_pdf, departures_pdf, arrivals_csv, departures_csv, report_type="Weekly"):
                 logger.info("✓ Weekly email sent successfully!")
@@ -1233,8 +1340,6 @@ def run_weekly_report():
                 save_successful_weekly_run()
             else:
                 logger.warning("Weekly email sending failed or not configured.")
-        except ImportError:
-            logger.info("Email API not configured (api_email_sender.py). Skipping email.")
         except Exception as e:
             logger.error(f"Weekly email error: {e}")
             
@@ -1251,7 +1356,6 @@ def run_weekly_report():
             
         # Send Failure Alert (SMS/Telegram)
         try:
-            from api_email_sender import send_failure_alert
             send_failure_alert(error_details)
         except Exception as alert_err:
             logger.error(f"Failed to send failure alert: {alert_err}")
@@ -1262,8 +1366,6 @@ def run_daily_status_check():
     """
     logger.info("Running daily status check...")
     try:
-        from api_email_sender import send_telegram_notification
-        from datetime import datetime
         now_str = datetime.now().strftime("%Y-%m-%d %H:%M")
         msg = f"✅ Automation Status Check\nTime: {now_str}\nStatus: Running correctly"
         
@@ -1272,54 +1374,111 @@ def run_daily_status_check():
         else:
             logger.warning("Failed to send daily status notification.")
             
-    except ImportError:
-        logger.error("Could not import send_telegram_notification from api_email_sender")
     except Exception as e:
         logger.error(f"Error sending daily status: {e}")
 
 
 
+def with_backoff(fn, *, retry_on, retries=3, base_delay=1.0, max_delay=15.0):
+    """
+    Call fn, retrying on the given exception types with exponential backoff and jitter.
+    Any other exception, or the final failure, propagates to the caller.
+    """
+    for retry in range(retries):
+        try:
+            return fn()
+        except retry_on as exc:
+            if retry == retries - 1:
+                raise
+            delay = backoff_delay(retry, base_delay=base_delay, max_delay=max_delay)
+            logger.info(f"  Transient failure ({exc}); retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+
+def heartbeat_request(target_context):
+    """
+    Keep the session alive with one authenticated GET of the dashboard through the
+    context's request API. Returns True only if it comes back 200 with no login redirect.
+    """
+    try:
+        response = target_context.request.get(
+            REI_CLOUD_URL, max_redirects=0, timeout=HEARTBEAT_REQUEST_TIMEOUT_MS
+        )
+    except Exception as exc:
+        logger.debug("Heartbeat request failed: %s", exc)
+        return False
+
+    try:
+        # An expired session answers with a 302 to the B2C login page
+        return response.ok and not is_login_url(response.url)
+    finally:
+        response.dispose()
+
+
 def heartbeat_check():
     """
     Heartbeat to keep session alive and verify browser is authenticated.
-    Navigates between pages to generate server activity, then verifies login status.
-    Runs every 30 minutes. If session expired, attempts auto re-login.
+    Confirms the session with one authenticated request, falling back to navigating
+    between pages in a spare tab when that is inconclusive. Runs every 30 minutes. If session expired, attempts auto re-login.
+    Repeated re-login failures back off exponentially so heartbeats do not hammer the login page.
     Alerts via SMS/Telegram only if re-login also fails.
     """
-    global page, context, playwright_instance
+    global page, context, playwright_instance, heartbeat_relogin_failures, heartbeat_relogin_retry_at
     
     logger.info("💓 Running heartbeat check (keep-alive)...")
     
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+    
     try:
         # Check 1: Is playwright/browser still running?
         if not playwright_instance or not context or not page:
             raise Exception("Browser instance not running")
         
+        if not page_is_responsive(page):
+            raise Exception("Browser page is unresponsive")
+        
+        # Fast path: one authenticated request, no navigation or rendering
+        if heartbeat_request(context):
+            logger.info("✓ Heartbeat OK - Session active and kept alive")
+            return True
+        logger.info("  Keep-alive request did not confirm the session; checking with full navigation...")
+        
+        # Keep-alive navigation runs in a spare tab so the main page is left where it is
+        hb_page = acquire_heartbeat_page()
+        
         # Step 1: Navigate to Reports page first (generates server activity)
         try:
             logger.info("  → Navigating to Reports page...")
-            page.goto(REPORT_LIST_URL, timeout=30000)
-            page.wait_for_timeout(2000)
+            # Timeouts are retried as network blips; a closed page or browser fails at once
+            with_backoff(
+                lambda: hb_page.goto(REPORT_LIST_URL, timeout=15000, wait_until="domcontentloaded"),
+                retry_on=PlaywrightTimeoutError,
+            )
+            wait_for_page_marker(hb_page, "text=Arrival Report")
         except Exception as nav_error:
             raise Exception(f"Navigation to Reports failed: {nav_error}")
         
-        if page_is_login_page(page) or page_requires_totp(page) or not page_is_report_list_ready(page, report_label="Arrival Report"):
+        if page_is_login_page(hb_page) or page_requires_totp(hb_page) or not page_is_report_list_ready(hb_page, report_label="Arrival Report"):
             raise Exception("Session expired - redirected to login page")
         
         # Step 2: Navigate back to Dashboard (second navigation = more activity)
         try:
             logger.info("  → Navigating back to Dashboard...")
-            page.goto(REI_CLOUD_URL, timeout=30000)
-            page.wait_for_timeout(2000)
+            with_backoff(
+                lambda: hb_page.goto(REI_CLOUD_URL, timeout=15000, wait_until="domcontentloaded"),
+                retry_on=PlaywrightTimeoutError,
+            )
+            wait_for_page_marker(hb_page, DASHBOARD_MARKER)
         except Exception as nav_error:
             raise Exception(f"Navigation to Dashboard failed: {nav_error}")
         
-        if page_is_login_page(page) or page_requires_totp(page):
+        if page_is_login_page(hb_page) or page_requires_totp(hb_page):
             raise Exception("Session expired - redirected to login page")
         
-        if not page_is_dashboard_ready(page):
+        if not page_is_dashboard_ready(hb_page):
             raise Exception("Dashboard element not found - may not be authenticated")
         
+        release_heartbeat_page()
         logger.info("✓ Heartbeat OK - Session active and kept alive")
         return True
         
@@ -1327,32 +1486,47 @@ def heartbeat_check():
         error_msg = f"HEARTBEAT ISSUE: {str(e)}"
         logger.warning(error_msg)
         
-        # Attempt auto re-login before alerting
-        if has_configured_rei_credentials():
+        # Attempt auto re-login before alerting, unless backing off after earlier failures
+        if has_configured_rei_credentials() and time.monotonic() < heartbeat_relogin_retry_at:
+            logger.info(
+                "Skipping re-login; backing off for %.0f more seconds after %s failed attempt(s).",
+                heartbeat_relogin_retry_at - time.monotonic(),
+                heartbeat_relogin_failures,
+            )
+        elif has_configured_rei_credentials():
             logger.info("🔄 Attempting automatic re-login...")
             try:
                 if recover_session_with_fresh_context("heartbeat", target="dashboard"):
                     logger.info("✓ Re-login successful! Session restored.")
+                    heartbeat_relogin_failures = 0
+                    heartbeat_relogin_retry_at = 0.0
                     return True
             except Exception as recovery_err:
                 logger.error(f"❌ Re-login failed! {recovery_err}")
+            heartbeat_relogin_retry_at = time.monotonic() + backoff_delay(
+                heartbeat_relogin_failures,
+                base_delay=HEARTBEAT_RELOGIN_BASE_DELAY_SECONDS,
+                max_delay=HEARTBEAT_RELOGIN_MAX_DELAY_SECONDS,
+            )
+            heartbeat_relogin_failures += 1
         
         # Re-login failed or no credentials - send alert
-        alert_msg = f"HEARTBEAT FAILED: {str(e)} - Auto re-login also failed or not configured."
+        alert_msg = f"HEARTBEAT FAILED: {str(e)} - Auto re-login also failed, is backing off, or is not configured."
         
         try:
-            if page:
+            shot_page = heartbeat_page or page
+            if shot_page:
                 scr_path = f"error_heartbeat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                page.screenshot(path=scr_path)
+                shot_page.screenshot(path=scr_path)
                 logger.info(f"Screenshot saved to {scr_path}")
                 alert_msg += f"\nScreenshot saved as {scr_path}"
         except Exception as scr_err:
             logger.error(f"Could not take screenshot: {scr_err}")
+        release_heartbeat_page()
 
         logger.error(alert_msg)
         
         try:
-            from api_email_sender import send_failure_alert
             send_failure_alert(alert_msg)
         except Exception as alert_err:
             logger.error(f"Failed to send heartbeat alert: {alert_err}")
@@ -1384,22 +1558,166 @@ def auto_login():
     )
 
 
-def input_listener(stop_event, trigger_daily_event, trigger_weekly_event):
-    """Listens for 'run_d' or 'run_w' command in a separate thread."""
-    while not stop_event.is_set():
+def open_command_selector():
+    """Register stdin for manual trigger commands. Returns a selector, or None if unavailable."""
+    selector = selectors.DefaultSelector()
+    try:
+        selector.register(sys.stdin.fileno(), selectors.EVENT_READ)
+    except (AttributeError, ValueError, OSError) as e:
+        logger.info(f"stdin cannot be polled ({e}); reading manual triggers on a thread instead.")
+        selector.close()
+        return None
+    return selector
+
+
+def open_trigger_socket():
+    """
+    Bind REI_TRIGGER_SOCKET on its own selector, independent of stdin, so cron or
+    systemd can send manual triggers. Returns the selector, or None if not configured.
+    """
+    if not TRIGGER_SOCKET_PATH:
+        return None
+    if not hasattr(socket, "AF_UNIX"):
+        logger.warning("REI_TRIGGER_SOCKET is set, but Unix socket triggers are not supported on this platform.")
+        return None
+
+    try:
+        # Clear a socket left behind by an unclean exit; never remove anything else
+        if stat.S_ISSOCK(os.stat(TRIGGER_SOCKET_PATH).st_mode):
+            os.unlink(TRIGGER_SOCKET_PATH)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not check trigger socket path {TRIGGER_SOCKET_PATH}: {e}")
+
+    selector = selectors.DefaultSelector()
+    trigger_socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    try:
+        trigger_socket.bind(TRIGGER_SOCKET_PATH)
+        trigger_socket.setblocking(False)
+        selector.register(trigger_socket, selectors.EVENT_READ)
+    except OSError as e:
+        logger.warning(f"Could not open trigger socket {TRIGGER_SOCKET_PATH}: {e}")
+        trigger_socket.close()
+        selector.close()
+        return None
+
+    def remove_trigger_socket():
+        selector.close()
+        trigger_socket.close()
+        try:
+            os.unlink(TRIGGER_SOCKET_PATH)
+        except OSError:
+            pass
+
+    atexit.register(remove_trigger_socket)
+    logger.info(f"Listening for manual triggers on {TRIGGER_SOCKET_PATH}")
+    return selector
+
+
+def poll_trigger_socket(selector, timeout):
+    """Wait up to timeout seconds for trigger socket datagrams and return their command lines."""
+    commands = []
+    for key, _ in selector.select(timeout):
         try:
-            line = sys.stdin.readline()
-            if not line:
-                break
-            cmd = line.strip().lower()
-            if cmd == "run_d" and not stop_event.is_set():
-                trigger_daily_event.set()
-            elif cmd == "run_w" and not stop_event.is_set():
-                trigger_weekly_event.set()
-            elif cmd and not stop_event.is_set():
-                logger.info("Type 'run_d' for daily report or 'run_w' for weekly report.")
-        except:
-            break
+            data = key.fileobj.recv(4096)
+        except BlockingIOError:
+            continue
+        commands.extend(line.strip().lower() for line in data.decode(errors="replace").splitlines())
+    return commands
+
+
+def start_command_reader():
+    """
+    Fallback for consoles whose stdin cannot be polled (e.g. Windows): read command
+    lines on a daemon thread into a queue. Returns None if there is no stdin at all.
+    """
+    if sys.stdin is None:
+        logger.warning("Manual triggers unavailable (no stdin).")
+        return None
+
+    commands = queue.Queue()
+
+    def read_lines():
+        for line in sys.stdin:
+            commands.put(line.strip().lower())
+
+    threading.Thread(target=read_lines, name="command-reader", daemon=True).start()
+    return commands
+
+
+def drain_command_queue(commands, timeout):
+    """Wait up to timeout seconds for a queued command line and return all that are pending."""
+    try:
+        pending = [commands.get(timeout=timeout)]
+    except queue.Empty:
+        return []
+    while True:
+        try:
+            pending.append(commands.get_nowait())
+        except queue.Empty:
+            return pending
+
+
+def poll_commands(selector, timeout, buffer):
+    """
+    Wait up to timeout seconds for stdin input and return any complete command lines.
+    Unregisters stdin on EOF so a closed stdin does not spin the loop.
+    """
+    if selector is None or not selector.get_map():
+        time.sleep(timeout)
+        return []
+
+    commands = []
+    for _ in selector.select(timeout):
+        chunk = os.read(sys.stdin.fileno(), 4096)
+        if not chunk:
+            selector.unregister(sys.stdin.fileno())
+            continue
+        buffer.extend(chunk)
+        *lines, rest = buffer.split(b"\n")
+        buffer[:] = rest
+        commands.extend(line.decode(errors="replace").strip().lower() for line in lines)
+    return commands
+
+
+def idle_wait_seconds(idle, max_wait=MAIN_LOOP_MAX_IDLE_SECONDS):
+    """Clamp schedule.idle_seconds() (None when nothing is scheduled) to [0, max_wait]."""
+    if idle is None:
+        return max_wait
+    return min(max(idle, 0), max_wait)
+
+
+def dispatch_command(cmd, trigger_daily_event, trigger_weekly_event):
+    """Map a 'run_d' / 'run_w' command to its trigger event."""
+    if cmd == "run_d":
+        trigger_daily_event.set()
+    elif cmd == "run_w":
+        trigger_weekly_event.set()
+    elif cmd:
+        logger.info("Type 'run_d' for daily report or 'run_w' for weekly report.")
+
+# Brisbane wall-clock jobs registered by main(): (description, schedule unit, "HH:MM", job).
+# The daily report is added separately because --test replaces it with a 5-minute interval.
+BRISBANE_SCHEDULE = (
+    ("weekly report", "saturday", f"{WEEKLY_SCHEDULED_HOUR:02d}:{WEEKLY_SCHEDULED_MINUTE:02d}", run_weekly_report),
+    ("status check", "day", "21:00", run_daily_status_check),
+    ("booking data extraction maintenance", "day", "14:00", run_booking_maintenance_job),
+    ("rolling booking window snapshot", "day", "14:15", run_booking_future_snapshot),
+)
+
+
+def schedule_brisbane_jobs(scheduler, include_daily_report=True):
+    """Register the BRISBANE_SCHEDULE jobs (and the daily report) on a schedule.Scheduler."""
+    brisbane_jobs = list(BRISBANE_SCHEDULE)
+    if include_daily_report:
+        brisbane_jobs.insert(0, ("report", "day", f"{SCHEDULED_RUN_HOUR:02d}:{SCHEDULED_RUN_MINUTE:02d}", run_daily_report))
+
+    for description, unit, at_time, job in brisbane_jobs:
+        when = "daily" if unit == "day" else f"every {unit.capitalize()}"
+        logger.info(f"Scheduling {description} {when} at {at_time} Brisbane time")
+        getattr(scheduler.every(), unit).at(at_time, BRISBANE_TZ_NAME).do(job)
+
 
 def main():
     global page
@@ -1419,10 +1737,9 @@ def main():
     # Initialize state before any notification or watchdog logic so restart
     # behavior can be deduped persistently across service restarts.
     init_state_if_needed()
-    init_weekly_state_if_needed()
     wait_while_paused()
     
-    logger.info("=" * 60)
+    logger.info(BANNER)
     logger.info("REI CLOUD AUTOMATION")
     if record_mode:
         logger.info("MODE: Recording workflow")
@@ -1431,14 +1748,15 @@ def main():
     else:
         logger.info("MODE: Production (daily at 08:00)")
     logger.info("Press Ctrl+C to stop")
-    logger.info("=" * 60)
+    logger.info(BANNER)
     
     # Start browser
-    setup_browser()
+    setup_browser(record_mode=record_mode)
     
     # Navigate
     logger.info(f"Opening {REI_CLOUD_URL}")
-    page.goto(REI_CLOUD_URL, timeout=60000)
+    page.goto(REI_CLOUD_URL, timeout=60000, wait_until="domcontentloaded")
+    wait_for_page_marker(page, DASHBOARD_MARKER)
     
     # Check if already logged in (quick check by URL)
     is_logged_in = page_is_authenticated_session(page)
@@ -1447,16 +1765,16 @@ def main():
     if not is_logged_in and has_configured_rei_credentials():
         logger.info("Credentials found via env or 1Password - attempting auto-login...")
         if auto_login():
-            # Give it a moment to fully load dashboard
-            page.wait_for_timeout(3000)
+            # Let the dashboard finish rendering
+            wait_for_page_marker(page, DASHBOARD_MARKER)
             is_logged_in = page_is_authenticated_session(page)
     
     logger.info("")
-    logger.info("=" * 60)
+    logger.info(BANNER)
     if is_logged_in:
         logger.info("✓ Logged in successfully!")
         logger.info("Starting automation in 3 seconds...")
-        logger.info("=" * 60)
+        logger.info(BANNER)
         time.sleep(3)  # Brief pause before starting
     else:
         if has_configured_rei_credentials():
@@ -1464,9 +1782,9 @@ def main():
         logger.info("LOG IN to REI Master Apps in the browser window.")
         logger.info("When you're logged in and on the dashboard,")
         logger.info("come back here and press ENTER to continue...")
-        logger.info("=" * 60)
+        logger.info(BANNER)
         sys.stdin.readline()  # Wait for Enter
-        page.wait_for_timeout(3000)
+        wait_for_page_marker(page, DASHBOARD_MARKER)
         is_logged_in = page_is_authenticated_session(page)
     
     logger.info("✓ Starting automation engine...")
@@ -1486,7 +1804,7 @@ def main():
                         logger.info(f"visited: {current_url}")
                         recorded_urls.append(current_url)
                         last_url = current_url
-                except:
+                except Exception:
                     pass
         except KeyboardInterrupt:
             logger.info("Recording complete.")
@@ -1494,34 +1812,21 @@ def main():
             return
 
     # Normal Schedule Mode (all times in Australia/Brisbane timezone)
+    import schedule
+
     if test_mode:
         logger.info("Scheduling report every 5 minutes")
-        schedule.every(5).minutes.do(run_daily_report)
-    else:
-        logger.info("Scheduling report daily at 13:00 Brisbane time")
-        schedule.every().day.at("13:00", "Australia/Brisbane").do(run_daily_report)
-
-    # Weekly report every Saturday at 08:00 AM Brisbane time
-    logger.info("Scheduling weekly report every Saturday at 08:00 Brisbane time")
-    schedule.every().saturday.at("08:00", "Australia/Brisbane").do(run_weekly_report)
-
-    # Daily Status Check (Telegram) at 9:00 PM Brisbane time
-    logger.info("Scheduling daily status check at 21:00 Brisbane time")
-    schedule.every().day.at("21:00", "Australia/Brisbane").do(run_daily_status_check)
-    
-    # Heartbeat check every 30 minutes to keep session alive and verify authentication
-    logger.info("Scheduling heartbeat check every 30 minutes")
-    schedule.every(30).minutes.do(heartbeat_check)
-    
-    # Booking Data Extraction Maintenance
-    logger.info("Scheduling booking data extraction maintenance daily at 14:00 Brisbane time")
-    schedule.every().day.at("14:00", "Australia/Brisbane").do(run_booking_maintenance_job)
+        schedule.every(5).minutes.do(run_daily_report, use_cache=True)
+    schedule_brisbane_jobs(schedule.default_scheduler, include_daily_report=not test_mode)
     logger.info(
-        "Scheduling rolling booking window snapshot daily at 14:15 Brisbane time (%s days back, %s days ahead)",
+        "Rolling booking window snapshot covers %s days back, %s days ahead",
         BOOKING_FUTURE_WINDOW_DAYS_BACK,
         BOOKING_FUTURE_WINDOW_DAYS_AHEAD,
     )
-    schedule.every().day.at("14:15", "Australia/Brisbane").do(run_booking_future_snapshot)
+    
+    # Heartbeat check every 30 minutes to keep session alive and verify authentication
+    logger.info("Scheduling heartbeat check every 30 minutes")
+    schedule.every(30).minutes.do(heartbeat_check)
     
     # Run immediately if --run-now (first time)
     if run_now:
@@ -1545,7 +1850,7 @@ def main():
         logger.info("Running rolling booking window extraction (--run-future-window-bookings)...")
         run_booking_future_snapshot()
     
-    logger.info("=" * 60)
+    logger.info(BANNER)
     logger.info("AUTOMATION IS LIVE")
     logger.info(f"1. Daily report scheduled at {SCHEDULED_RUN_HOUR:02d}:{SCHEDULED_RUN_MINUTE:02d}")
     logger.info("2. Weekly report scheduled every Saturday at 08:00")
@@ -1557,19 +1862,40 @@ def main():
     # Send startup notification
     if should_send_startup_notification():
         try:
-            from api_email_sender import send_telegram_notification
             send_telegram_notification("🚀 Automation is Live\nSystem initialized and ready.")
         except Exception as e:
             logger.warning(f"Failed to send startup notification: {e}")
 
-    # Setup background thread to listen for manual trigger commands
-    stop_event = threading.Event()
+    # Poll stdin for manual trigger commands from the main loop (no listener thread)
     trigger_daily_event = threading.Event()
     trigger_weekly_event = threading.Event()
-    input_thread = threading.Thread(target=input_listener, args=(stop_event, trigger_daily_event, trigger_weekly_event), daemon=True)
-    input_thread.start()
+    command_selector = open_command_selector()
+    command_queue = start_command_reader() if command_selector is None else None
+    trigger_selector = open_trigger_socket()
+    command_buffer = bytearray()
     pause_logged = False
 
+    def read_stdin_commands(timeout):
+        if command_queue is not None:
+            return drain_command_queue(command_queue, timeout)
+        return poll_commands(command_selector, timeout, command_buffer)
+
+    def wait_for_commands(timeout):
+        if trigger_selector is None:
+            commands = read_stdin_commands(timeout)
+        else:
+            # Alternate short waits on the socket with non-blocking stdin reads
+            deadline = time.monotonic() + timeout
+            commands = []
+            while not commands:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                commands = poll_trigger_socket(trigger_selector, min(remaining, COMMAND_POLL_SLICE_SECONDS))
+                commands += read_stdin_commands(0)
+        for cmd in commands:
+            dispatch_command(cmd, trigger_daily_event, trigger_weekly_event)
+
     # Main Loop
     try:
         while True:
@@ -1586,7 +1912,7 @@ def main():
                     trigger_weekly_event.clear()
                     logger.info("Cleared queued manual triggers while pause flag is active.")
 
-                time.sleep(5)
+                wait_for_commands(5)
                 continue
 
             if pause_logged:
@@ -1595,9 +1921,12 @@ def main():
 
             schedule.run_pending()
             
+            # One clock read per iteration, shared by both watchdogs and their alerts
+            loop_now = current_utc_time()
+            
             # Watchdog: Check for missed run using deadline-based logic
             # Only alert if: past deadline (scheduled time + grace period) AND no success since deadline
-            is_past, next_expected_dt, last_success_dt = is_past_deadline()
+            is_past, next_expected_dt, last_success_dt = is_past_deadline(loop_now)
             
             if is_past and next_expected_dt:
                 missed_run = (last_success_dt is None) or (last_success_dt < next_expected_dt)
@@ -1605,18 +1934,17 @@ def main():
                 if missed_run:
                     token = missed_daily_notification_token(next_expected_dt)
                     if record_notification_if_new(MISSED_DAILY_NOTIFICATION_CATEGORY, token):
-                        now = datetime.now()
+                        now = loop_now.astimezone()
                         msg = f"MISSED SCHEDULED RUN. Expected by: {next_expected_dt.strftime('%Y-%m-%d %H:%M')}. Current time: {now.strftime('%H:%M')}. Please check server."
                         logger.warning(msg)
 
                         try:
-                            from api_email_sender import send_failure_alert
                             send_failure_alert(msg)
                         except Exception as ex:
                             logger.error(f"Failed to send missed run alert: {ex}")
 
             # Weekly Watchdog: Check for missed weekly run using deadline-based logic
-            is_past_weekly, next_expected_weekly_dt, last_weekly_success_dt = is_past_weekly_deadline()
+            is_past_weekly, next_expected_weekly_dt, last_weekly_success_dt = is_past_weekly_deadline(loop_now)
 
             if is_past_weekly and next_expected_weekly_dt:
                 missed_weekly_run = (last_weekly_success_dt is None) or (last_weekly_success_dt < next_expected_weekly_dt)
@@ -1624,12 +1952,11 @@ def main():
                 if missed_weekly_run:
                     token = missed_weekly_notification_token(next_expected_weekly_dt)
                     if record_notification_if_new(MISSED_WEEKLY_NOTIFICATION_CATEGORY, token):
-                        now = datetime.now()
+                        now = loop_now.astimezone()
                         msg = f"MISSED WEEKLY SCHEDULED RUN. Expected by: {next_expected_weekly_dt.strftime('%Y-%m-%d %H:%M')} (Saturday). Current time: {now.strftime('%Y-%m-%d %H:%M')}. Please check server."
                         logger.warning(msg)
 
                         try:
-                            from api_email_sender import send_failure_alert
                             send_failure_alert(msg)
                         except Exception as ex:
                             logger.error(f"Failed to send missed weekly run alert: {ex}")
@@ -1647,10 +1974,10 @@ def main():
                 logger.info("Manual weekly trigger detected! Starting weekly report...")
                 run_weekly_report()
                 logger.info("Weekly report complete. Type 'run_d' or 'run_w' to trigger manually.")                
-            time.sleep(1)
+            # Sleep until the next job is due; typed commands still wake the loop immediately
+            wait_for_commands(idle_wait_seconds(schedule.idle_seconds()))
     except KeyboardInterrupt:
         logger.info("\nStopping...")
-        stop_event.set()
         cleanup()
 
 if __name__ == "__main__":
@@ -8,7 +8,11 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-from rei_auth_flow import auto_login as perform_auto_login
+from rei_auth_flow import (
+    EMAIL_INPUT_SELECTOR,
+    PASSWORD_INPUT_SELECTOR,
+    auto_login as perform_auto_login,
+)
 from rei_credentials import get_rei_password, get_rei_totp, get_rei_username
 
 # Setup paths
@@ -32,7 +36,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from playwright.sync_api import sync_playwright
+from playwright.sync_api import Error as PlaywrightError, sync_playwright
 
 DOWNLOAD_DIR = Path(os.getenv("DOWNLOAD_DIR", "/opt/paradise-automator/downloads"))
 DOWNLOAD_DIR.mkdir(exist_ok=True)
@@ -89,13 +93,22 @@ def configure_report_options(target_page):
                     logger.info(f"  - Already enabled: {option_name}")
         except Exception as e:
             logger.warning(f"  Could not set {option_name}: {e}")
-    
-    target_page.wait_for_timeout(500)
+
+
+def download_export(report_page, option_text, dest_path):
+    """Open whichever Export button is visible, pick a format and save the download."""
+    report_page.locator("[title='Export']:visible").first.click()
+    with report_page.expect_download() as download_info:
+        report_page.click(f"text={option_text}")
+    download_info.value.save_as(dest_path)
+    return dest_path
 
 
 def run_weekly():
+    run_started = datetime.now()
+    date_tag = run_started.strftime('%Y%m%d')
     logger.info("=" * 60)
-    logger.info(f"MANUAL WEEKLY REPORT - {datetime.now()}")
+    logger.info(f"MANUAL WEEKLY REPORT - {run_started}")
     logger.info("=" * 60)
     
     with sync_playwright() as p:
@@ -117,8 +130,15 @@ def run_weekly():
         try:
             # Navigate to dashboard
             logger.info(f"Opening {REI_CLOUD_URL}")
-            page.goto(REI_CLOUD_URL, timeout=60000)
-            page.wait_for_timeout(3000)
+            page.goto(REI_CLOUD_URL, timeout=60000, wait_until="domcontentloaded")
+            
+            # Let any B2C redirect land: wait for the dashboard or a login form before checking
+            try:
+                page.locator("text=Dashboard").or_(
+                    page.locator(f"{EMAIL_INPUT_SELECTOR}, {PASSWORD_INPUT_SELECTOR}")
+                ).first.wait_for(state="visible", timeout=30000)
+            except PlaywrightError as e:
+                logger.warning(f"Neither dashboard nor login form appeared: {e}")
             
             # Check if logged in
             if not page_is_authenticated_session(page):
@@ -136,14 +156,14 @@ def run_weekly():
                     return False
             
             logger.info("✓ Logged in, navigating to Report List...")
-            page.goto(REPORT_LIST_URL, timeout=30000)
-            page.wait_for_timeout(3000)
+            page.goto(REPORT_LIST_URL, timeout=30000, wait_until="domcontentloaded")
+            page.locator("text=Arrival Report").first.wait_for(state="visible")
             
             # ===== ARRIVAL REPORT (WEEKLY) =====
             logger.info("Generating Arrival Report for next 7 days...")
             
             page.click("text=Arrival Report", timeout=5000)
-            page.wait_for_timeout(2000)
+            page.locator("a#btnPreviewBookingDate").wait_for(state="visible")
             
             configure_report_options(page)
             
@@ -151,9 +171,8 @@ def run_weekly():
             logger.info("Selecting 'Next 7 Days' for reports...")
             try:
                 page.evaluate("document.querySelector('#bookingNext7').parentNode.querySelector('.iCheck-helper').click()")
-            except:
+            except PlaywrightError:
                 page.click("label[for='bookingNext7']", force=True)
-            page.wait_for_timeout(1000)
             
             # Click Preview
             with context.expect_page() as new_page_info:
@@ -162,58 +181,35 @@ def run_weekly():
             report_page.wait_for_load_state("networkidle")
             logger.info("Report preview opened in new tab")
             
-            # Download PDF
-            report_page.wait_for_timeout(2000)
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-            
-            with report_page.expect_download() as download_info:
-                report_page.wait_for_timeout(500)
-                report_page.click("text=Acrobat (PDF) file")
-            download = download_info.value
-            arrivals_pdf = str(DOWNLOAD_DIR / f"weekly_arrivals_{datetime.now().strftime('%Y%m%d')}.pdf")
-            download.save_as(arrivals_pdf)
+            # Download PDF once the viewer toolbar is up
+            report_page.locator("[title='Export']:visible").first.wait_for()
+            arrivals_pdf = str(DOWNLOAD_DIR / f"weekly_arrivals_{date_tag}.pdf")
+            download_export(report_page, "Acrobat (PDF) file", arrivals_pdf)
             logger.info(f"✓ Saved Weekly Arrival Report (PDF): {arrivals_pdf}")
             
             # Download CSV
-            report_page.wait_for_timeout(1000)
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-            
-            with report_page.expect_download() as download_info:
-                report_page.wait_for_timeout(500)
-                report_page.click("text=CSV (comma delimited)")
-            download = download_info.value
-            arrivals_csv = str(DOWNLOAD_DIR / f"weekly_arrivals_{datetime.now().strftime('%Y%m%d')}.csv")
-            download.save_as(arrivals_csv)
+            arrivals_csv = str(DOWNLOAD_DIR / f"weekly_arrivals_{date_tag}.csv")
+            download_export(report_page, "CSV (comma delimited)", arrivals_csv)
             logger.info(f"✓ Saved Weekly Arrival Report (CSV): {arrivals_csv}")
             
             report_page.close()
-            page.wait_for_timeout(2000)
             
             # Go back to Report List
-            page.goto(REPORT_LIST_URL, timeout=30000)
-            page.wait_for_timeout(3000)
+            page.goto(REPORT_LIST_URL, timeout=30000, wait_until="domcontentloaded")
+            page.locator("text=Departure Report").first.wait_for(state="visible")
             
             # ===== DEPARTURE REPORT (WEEKLY) =====
             logger.info("Generating Departure Report for next 7 days...")
             
             page.click("text=Departure Report")
-            page.wait_for_timeout(2000)
+            page.locator("a#btnPreviewBookingDate").wait_for(state="visible")
             
             configure_report_options(page)
             
             try:
                 page.evaluate("document.querySelector('#bookingNext7').parentNode.querySelector('.iCheck-helper').click()")
-            except:
+            except PlaywrightError:
                 page.click("label[for='bookingNext7']", force=True)
-            page.wait_for_timeout(1000)
             
             with context.expect_page() as new_page_info:
                 page.click("a#btnPreviewBookingDate")
@@ -221,34 +217,13 @@ def run_weekly():
             report_page.wait_for_load_state("networkidle")
             logger.info("Report preview opened in new tab")
             
-            report_page.wait_for_timeout(2000)
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-            
-            with report_page.expect_download() as download_info:
-                report_page.wait_for_timeout(500)
-                report_page.click("text=Acrobat (PDF) file")
-            download = download_info.value
-            departures_pdf = str(DOWNLOAD_DIR / f"weekly_departures_{datetime.now().strftime('%Y%m%d')}.pdf")
-            download.save_as(departures_pdf)
+            report_page.locator("[title='Export']:visible").first.wait_for()
+            departures_pdf = str(DOWNLOAD_DIR / f"weekly_departures_{date_tag}.pdf")
+            download_export(report_page, "Acrobat (PDF) file", departures_pdf)
             logger.info(f"✓ Saved Weekly Departure Report (PDF): {departures_pdf}")
             
-            report_page.wait_for_timeout(1000)
-            export_btns = report_page.locator("[title='Export']")
-            for i in range(export_btns.count()):
-                if export_btns.nth(i).is_visible():
-                    export_btns.nth(i).click()
-                    break
-            
-            with report_page.expect_download() as download_info:
-                report_page.wait_for_timeout(500)
-                report_page.click("text=CSV (comma delimited)")
-            download = download_info.value
-            departures_csv = str(DOWNLOAD_DIR / f"weekly_departures_{datetime.now().strftime('%Y%m%d')}.csv")
-            download.save_as(departures_csv)
+            departures_csv = str(DOWNLOAD_DIR / f"weekly_departures_{date_tag}.csv")
+            download_export(report_page, "CSV (comma delimited)", departures_csv)
             logger.info(f"✓ Saved Weekly Departure Report (CSV): {departures_csv}")
             
             report_page.close()
@@ -279,7 +254,7 @@ def run_weekly():
             logger.error(f"Weekly report failed: {e}")
             try:
                 page.screenshot(path=f"/opt/paradise-automator/weekly_error_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png")
-            except:
+            except Exception:
                 pass
             context.close()
             return False
@@ -0,0 +1,297 @@
+import csv
+import gzip
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import api_email_sender
+from api_email_sender import parse_csv, parse_csv_by_date
+
+REPORT_COLUMNS = [
+    "textBox2",
+    "textBox4",
+    "textBox6",
+    "textBox7",
+    "textBox8",
+    "textBox10",
+    "textBox16",
+    "textBox19",
+    "textBox20",
+    "textBox32",
+    "textBox33",
+    "TrnReference1",
+]
+
+
+def write_report(path: Path, rows: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+class ParseCsvTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.csv_path = Path(self.temp_dir.name) / "arrivals.csv"
+
+    def test_parse_csv_maps_columns_and_joins_comments(self) -> None:
+        write_report(
+            self.csv_path,
+            [
+                {
+                    "TrnReference1": "101",
+                    "textBox4": "99999",
+                    "textBox2": "Monday, 1 March 2026",
+                    "textBox6": "2",
+                    "textBox7": "1",
+                    "textBox8": "0",
+                    "textBox10": "14:00",
+                    "textBox16": "2B3",
+                    "textBox19": "Test Guest",
+                    "textBox20": "Late arrival",
+                    "textBox32": "GC: Extra towels",
+                    "textBox33": "MC:",
+                }
+            ],
+        )
+
+        rows = parse_csv(str(self.csv_path))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(
+            rows[0],
+            {
+                "room": "101",
+                "booking_ref": "99999",
+                "room_type": "2B3",
+                "adults": "2",
+                "children": "1",
+                "infants": "0",
+                "time": "14:00",
+                "name": "Test Guest",
+                "date": "Monday, 1 March 2026",
+                "comments": "Late arrival | GC: Extra towels",
+            },
+        )
+
+    def test_parse_csv_skips_totals_headers_and_bond_refunds(self) -> None:
+        write_report(
+            self.csv_path,
+            [
+                {"TrnReference1": "Room"},
+                {"TrnReference1": "Total Arrivals:"},
+                {"TrnReference1": "BONDREFUND-12"},
+                {"TrnReference1": "- "},
+                {"TrnReference1": "Mantra 305", "textBox19": ""},
+            ],
+        )
+
+        rows = parse_csv(str(self.csv_path))
+
+        self.assertEqual([r["room"] for r in rows], ["Mantra 305"])
+        self.assertEqual(rows[0]["name"], "Guest")
+
+    def test_parse_csv_defaults_missing_columns_and_short_rows(self) -> None:
+        self.csv_path.write_text(
+            "TrnReference1,textBox19,textBox6\n101\n102,Bob,3,overflow\n",
+            encoding="utf-8",
+        )
+
+        rows = parse_csv(str(self.csv_path))
+
+        self.assertEqual([(r["room"], r["name"], r["adults"]) for r in rows], [("101", "Guest", "0"), ("102", "Bob", "3")])
+        self.assertEqual(rows[1]["booking_ref"], "")
+        self.assertEqual(rows[1]["children"], "0")
+
+    def test_parse_csv_by_date_orders_days_chronologically(self) -> None:
+        rows = [
+            {"room": "1", "date": "Monday, 2 February 2026"},
+            {"room": "2", "date": "Unknown"},
+            {"room": "3", "date": "Saturday, 31 January 2026"},
+            {"room": "4", "date": "Monday, 2 February 2026"},
+        ]
+
+        by_date = parse_csv_by_date(rows)
+
+        self.assertEqual(
+            list(by_date),
+            ["Saturday, 31 January 2026", "Monday, 2 February 2026", "Unknown"],
+        )
+        self.assertEqual([r["room"] for r in by_date["Monday, 2 February 2026"]], ["1", "4"])
+
+    def test_parse_csv_cache_follows_file_changes(self) -> None:
+        write_report(self.csv_path, [{"TrnReference1": "101"}])
+        first = parse_csv(str(self.csv_path))
+        first[0]["room"] = "mutated"
+
+        self.assertEqual(parse_csv(str(self.csv_path))[0]["room"], "101")
+
+        write_report(self.csv_path, [{"TrnReference1": "101"}, {"TrnReference1": "102"}])
+
+        self.assertEqual([r["room"] for r in parse_csv(str(self.csv_path))], ["101", "102"])
+
+    def test_parse_csv_returns_empty_list_for_missing_file(self) -> None:
+        self.assertEqual(parse_csv(str(self.csv_path)), [])
+        self.assertEqual(parse_csv(None), [])
+
+
+class SendReportsTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def test_send_reports_escapes_guest_fields_in_html(self) -> None:
+        arrivals_csv = Path(self.temp_dir.name) / "arrivals.csv"
+        write_report(
+            arrivals_csv,
+            [
+                {
+                    "TrnReference1": "101",
+                    "textBox2": "Monday, 1 March 2026",
+                    "textBox19": "<script>alert(1)</script>",
+                    "textBox20": "Tom & Jerry",
+                }
+            ],
+        )
+
+        with mock.patch.object(
+            api_email_sender, "send_email_via_comms_centre", return_value=True
+        ) as send_email, mock.patch.object(
+            api_email_sender, "send_telegram_notification", return_value=True
+        ), mock.patch.object(api_email_sender, "SMS_SENDER_NOTIFY", ""):
+            self.assertTrue(
+                api_email_sender.send_reports(None, None, str(arrivals_csv), None)
+            )
+
+        html_body = send_email.call_args.args[2]
+        self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", html_body)
+        self.assertIn("Tom &amp; Jerry", html_body)
+        self.assertNotIn("<script>", html_body)
+
+        # The weekly body also renders the date, which comes from the CSV
+        write_report(
+            arrivals_csv,
+            [
+                {
+                    "TrnReference1": "101",
+                    "textBox2": "<b>Monday</b>, <u>1 March 2026</u>",
+                    "textBox19": "<script>alert(1)</script>",
+                    "textBox20": "Tom & Jerry",
+                }
+            ],
+        )
+
+        with mock.patch.object(
+            api_email_sender, "send_email_via_comms_centre", return_value=True
+        ) as send_email, mock.patch.object(
+            api_email_sender, "send_telegram_notification", return_value=True
+        ), mock.patch.object(api_email_sender, "SMS_SENDER_NOTIFY", ""):
+            self.assertTrue(
+                api_email_sender.send_reports(
+                    None, None, str(arrivals_csv), None, report_type="Weekly"
+                )
+            )
+
+        html_body = send_email.call_args.args[2]
+        self.assertIn("&lt;b&gt;Monday&lt;/b&gt;", html_body)
+        self.assertIn("&lt;u&gt;1 March 2026&lt;/u&gt;", html_body)
+        self.assertIn("&lt;script&gt;alert(1)&lt;/script&gt;", html_body)
+        self.assertNotIn("<u>", html_body)
+        self.assertNotIn("<script>", html_body)
+
+
+class SendEmailTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.pdf_path = Path(self.temp_dir.name) / "report.pdf"
+        self.pdf_path.write_bytes(b"%PDF-1.4" + b"\0" * 1000)
+
+    def test_oversized_payload_is_rejected_before_sending(self) -> None:
+        with mock.patch.object(api_email_sender, "API_KEY", "key"), mock.patch.object(
+            api_email_sender, "MAX_PAYLOAD_BYTES", 500
+        ), mock.patch.object(api_email_sender, "_post_json") as post:
+            sent = api_email_sender.send_email_via_comms_centre(
+                "Subject", "Body", "<p>Body</p>", [str(self.pdf_path)], ["a@example.com"]
+            )
+
+        self.assertFalse(sent)
+        post.assert_not_called()
+
+    def test_missing_attachments_are_skipped(self) -> None:
+        response = mock.Mock(status_code=200, content=b'{"success": true}')
+        with mock.patch.object(api_email_sender, "API_KEY", "key"), mock.patch.object(
+            api_email_sender, "_post_json", return_value=response
+        ) as post:
+            sent = api_email_sender.send_email_via_comms_centre(
+                "Subject",
+                "Body",
+                "<p>Body</p>",
+                [str(self.pdf_path), str(Path(self.temp_dir.name) / "missing.pdf")],
+                ["a@example.com"],
+            )
+
+        self.assertTrue(sent)
+        attachments = post.call_args.args[0]["attachments"]
+        self.assertEqual([a["filename"] for a in attachments], ["report.pdf"])
+        self.assertEqual(attachments[0]["contentType"], "application/pdf")
+
+    def test_multipart_uploads_raw_files(self) -> None:
+        response = mock.Mock(status_code=200, content=b'{"success": true}')
+        with mock.patch.object(api_email_sender, "API_KEY", "key"), mock.patch.object(
+            api_email_sender, "API_MULTIPART", True
+        ), mock.patch.object(api_email_sender._SESSION, "post", return_value=response) as post:
+            sent = api_email_sender.send_email_via_comms_centre(
+                "Subject", "Body", "<p>Body</p>", [str(self.pdf_path)], ["a@example.com"]
+            )
+
+        self.assertTrue(sent)
+        kwargs = post.call_args.kwargs
+        self.assertEqual(kwargs["headers"], {"Content-Type": None})
+        self.assertEqual(json.loads(kwargs["data"]["to"]), ["a@example.com"])
+        self.assertNotIn("attachments", kwargs["data"])
+        name, _, content_type = kwargs["files"][0][1]
+        self.assertEqual((name, content_type), ("report.pdf", "application/pdf"))
+
+    def test_streamed_payload_matches_in_memory_encoding(self) -> None:
+        self.pdf_path.write_bytes(bytes(range(256)) * 500)
+        found = api_email_sender._stat_attachments([str(self.pdf_path)])
+        body = api_email_sender._StreamingPayload({"subject": "Subject"}, found)
+
+        for _ in range(2):  # re-iterable so retries resend the full body
+            streamed = json.loads(b"".join(body))
+            self.assertEqual(streamed["subject"], "Subject")
+            self.assertEqual(streamed["attachments"], [api_email_sender._build_attachment(*found[0])])
+
+
+class PostJsonTests(unittest.TestCase):
+    def test_large_bodies_are_gzipped_when_enabled(self) -> None:
+        payload = {"body": "x" * (api_email_sender._GZIP_MIN_BYTES + 1)}
+
+        with mock.patch.object(api_email_sender, "API_GZIP", True), mock.patch.object(
+            api_email_sender._SESSION, "post"
+        ) as post:
+            api_email_sender._post_json(payload, timeout=5)
+
+        kwargs = post.call_args.kwargs
+        self.assertEqual(kwargs["headers"], {"Content-Encoding": "gzip"})
+        self.assertEqual(json.loads(gzip.decompress(kwargs["data"])), payload)
+
+    def test_small_bodies_are_sent_uncompressed(self) -> None:
+        with mock.patch.object(api_email_sender, "API_GZIP", True), mock.patch.object(
+            api_email_sender._SESSION, "post"
+        ) as post:
+            api_email_sender._post_json({"body": "hi"}, timeout=5)
+
+        kwargs = post.call_args.kwargs
+        self.assertNotIn("headers", kwargs)
+        self.assertEqual(json.loads(kwargs["data"]), {"body": "hi"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+
+from rei_auth_flow import is_login_url
+
+
+class IsLoginUrlTests(unittest.TestCase):
+    def test_b2c_sign_in_pages_are_login_urls(self) -> None:
+        self.assertTrue(is_login_url("https://reiau.b2clogin.com/reiau.onmicrosoft.com/oauth2/v2.0/authorize"))
+        self.assertTrue(is_login_url("https://REIAU.B2CLOGIN.COM/authorize"))
+
+    def test_rei_login_and_account_paths_match_in_any_case(self) -> None:
+        self.assertTrue(is_login_url("https://reimasterapps.com.au/Login?returnUrl=%2F"))
+        self.assertTrue(is_login_url("https://reimasterapps.com.au/Customers/Account/LogOn"))
+        # The match is case-insensitive, so any /Account path counts, as the lowercased check always did
+        self.assertTrue(is_login_url("https://reimasterapps.com.au/Customers/Account"))
+
+    def test_authenticated_pages_are_not_login_urls(self) -> None:
+        self.assertFalse(is_login_url("https://reimasterapps.com.au/Customers/Dashboard?reicid=758"))
+        self.assertFalse(is_login_url("https://reimasterapps.com.au/Report/ReportList?reicid=758"))
+        # Only the leading slash keeps these out: the hints are path segments, not bare words
+        self.assertFalse(is_login_url("https://reimasterapps.com.au/Customers/MyAccounts?next=loginhistory"))
+
+    def test_missing_url_is_not_a_login_url(self) -> None:
+        self.assertFalse(is_login_url(""))
+        self.assertFalse(is_login_url(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import socket
+import tempfile
+import unittest
+from datetime import datetime
+from unittest import mock
+
+# Import from a scratch directory so the module's log file and downloads stay out of the tree
+_SCRATCH_DIR = tempfile.mkdtemp()
+os.environ.setdefault("DOWNLOAD_DIR", os.path.join(_SCRATCH_DIR, "downloads"))
+_ORIGINAL_CWD = os.getcwd()
+os.chdir(_SCRATCH_DIR)
+try:
+    import schedule
+
+    import rei_cloud_automation
+    from rei_cloud_automation import (
+        BRISBANE_SCHEDULE,
+        BRISBANE_TZ,
+        SCHEDULED_RUN_TIME,
+        WEEKLY_SCHEDULED_DAY,
+        WEEKLY_SCHEDULED_TIME,
+        _next_occurrence,
+        get_next_scheduled_time,
+        get_next_weekly_scheduled_time,
+    )
+except ImportError as exc:  # pytz / schedule are runtime dependencies of the automation
+    rei_cloud_automation = None
+    IMPORT_ERROR = str(exc)
+else:
+    IMPORT_ERROR = ""
+finally:
+    os.chdir(_ORIGINAL_CWD)
+
+
+WEEKDAY_NAMES = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def brisbane(year, month, day, hour=0, minute=0):
+    return BRISBANE_TZ.localize(datetime(year, month, day, hour, minute))
+
+
+@unittest.skipIf(rei_cloud_automation is None, f"automation dependencies missing: {IMPORT_ERROR}")
+class NextOccurrenceTests(unittest.TestCase):
+    def test_daily_slot_later_today_is_used(self) -> None:
+        # Monday 2 March 2026, before 13:00
+        self.assertEqual(_next_occurrence(brisbane(2026, 3, 2, 9, 30), SCHEDULED_RUN_TIME), brisbane(2026, 3, 2, 13))
+
+    def test_daily_slot_already_passed_rolls_to_tomorrow(self) -> None:
+        self.assertEqual(_next_occurrence(brisbane(2026, 3, 2, 13, 1), SCHEDULED_RUN_TIME), brisbane(2026, 3, 3, 13))
+
+    def test_daily_slot_at_exactly_run_time_rolls_to_tomorrow(self) -> None:
+        self.assertEqual(_next_occurrence(brisbane(2026, 3, 2, 13), SCHEDULED_RUN_TIME), brisbane(2026, 3, 3, 13))
+
+    def test_weekly_slot_later_this_week(self) -> None:
+        # Thursday 5 March 2026 -> Saturday 7 March
+        result = _next_occurrence(brisbane(2026, 3, 5, 18), WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY)
+
+        self.assertEqual(result, brisbane(2026, 3, 7, 8))
+        self.assertEqual(result.weekday(), WEEKLY_SCHEDULED_DAY)
+
+    def test_weekly_slot_same_day_before_and_after(self) -> None:
+        saturday = (2026, 3, 7)
+
+        self.assertEqual(
+            _next_occurrence(brisbane(*saturday, 7, 59), WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY),
+            brisbane(*saturday, 8),
+        )
+        self.assertEqual(
+            _next_occurrence(brisbane(*saturday, 8, 1), WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY),
+            brisbane(2026, 3, 14, 8),
+        )
+
+    def test_weekly_slot_rolls_over_month_and_year(self) -> None:
+        # Sunday 27 December 2026 -> Saturday 2 January 2027
+        self.assertEqual(
+            _next_occurrence(brisbane(2026, 12, 27, 12), WEEKLY_SCHEDULED_TIME, WEEKLY_SCHEDULED_DAY),
+            brisbane(2027, 1, 2, 8),
+        )
+
+
+@unittest.skipIf(rei_cloud_automation is None, f"automation dependencies missing: {IMPORT_ERROR}")
+class NextScheduledTimeTests(unittest.TestCase):
+    def test_daily_run_before_slot_is_next_due_tomorrow(self) -> None:
+        # A run earlier today still satisfies today's slot; Brisbane is UTC+10 year round
+        self.assertEqual(get_next_scheduled_time(datetime(2026, 3, 2, 9, 0)), "2026-03-03T03:00:00+00:00")
+
+    def test_daily_run_after_slot_is_next_due_tomorrow(self) -> None:
+        self.assertEqual(get_next_scheduled_time(datetime(2026, 3, 2, 13, 5)), "2026-03-03T03:00:00+00:00")
+
+    def test_aware_utc_input_is_read_in_brisbane_time(self) -> None:
+        # 2026-03-02 20:00 UTC is already Tuesday 06:00 in Brisbane
+        from_time = brisbane(2026, 3, 3, 6).astimezone(rei_cloud_automation.pytz.UTC)
+
+        self.assertEqual(get_next_scheduled_time(from_time), "2026-03-04T03:00:00+00:00")
+
+    def test_weekly_run_on_saturday_is_next_due_the_following_saturday(self) -> None:
+        self.assertEqual(get_next_weekly_scheduled_time(datetime(2026, 3, 7, 7, 0)), "2026-03-13T22:00:00+00:00")
+        self.assertEqual(get_next_weekly_scheduled_time(datetime(2026, 3, 7, 9, 0)), "2026-03-13T22:00:00+00:00")
+
+    def test_weekly_run_midweek_is_next_due_this_saturday(self) -> None:
+        self.assertEqual(get_next_weekly_scheduled_time(datetime(2026, 3, 4, 12, 0)), "2026-03-06T22:00:00+00:00")
+
+    def test_weekly_run_rolls_over_year_end(self) -> None:
+        self.assertEqual(get_next_weekly_scheduled_time(datetime(2026, 12, 26, 10, 0)), "2027-01-01T22:00:00+00:00")
+
+
+@unittest.skipIf(rei_cloud_automation is None, f"automation dependencies missing: {IMPORT_ERROR}")
+class BrisbaneScheduleTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scheduler = schedule.Scheduler()
+
+    def jobs_by_function(self):
+        return {job.job_func.func: job for job in self.scheduler.jobs}
+
+    def test_every_table_entry_registers_in_brisbane_time(self) -> None:
+        rei_cloud_automation.schedule_brisbane_jobs(self.scheduler)
+
+        jobs = self.jobs_by_function()
+        self.assertEqual(len(self.scheduler.jobs), len(BRISBANE_SCHEDULE) + 1)
+        for _, unit, at_time, func in BRISBANE_SCHEDULE:
+            job = jobs[func]
+            if unit == "day":
+                self.assertEqual(job.unit, "days")
+            else:
+                self.assertEqual(job.start_day, unit)
+            self.assertEqual(job.at_time.strftime("%H:%M"), at_time)
+            self.assertEqual(str(job.at_time_zone), "Australia/Brisbane")
+
+    def test_report_jobs_match_the_watchdog_schedule(self) -> None:
+        rei_cloud_automation.schedule_brisbane_jobs(self.scheduler)
+
+        jobs = self.jobs_by_function()
+        daily = jobs[rei_cloud_automation.run_daily_report]
+        weekly = jobs[rei_cloud_automation.run_weekly_report]
+        self.assertEqual(daily.at_time, SCHEDULED_RUN_TIME)
+        self.assertEqual(weekly.at_time, WEEKLY_SCHEDULED_TIME)
+        # The scheduler fires on the weekday the weekly watchdog expects
+        self.assertEqual(weekly.start_day, WEEKDAY_NAMES[WEEKLY_SCHEDULED_DAY])
+
+    def test_test_mode_leaves_the_daily_report_out(self) -> None:
+        rei_cloud_automation.schedule_brisbane_jobs(self.scheduler, include_daily_report=False)
+
+        self.assertNotIn(rei_cloud_automation.run_daily_report, self.jobs_by_function())
+        self.assertEqual(len(self.scheduler.jobs), len(BRISBANE_SCHEDULE))
+
+
+@unittest.skipIf(rei_cloud_automation is None, f"automation dependencies missing: {IMPORT_ERROR}")
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets unavailable")
+class TriggerSocketTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.socket_path = os.path.join(tempfile.mkdtemp(), "automation.sock")
+        with mock.patch.object(rei_cloud_automation, "TRIGGER_SOCKET_PATH", self.socket_path):
+            self.selector = rei_cloud_automation.open_trigger_socket()
+        self.assertIsNotNone(self.selector)
+
+    def tearDown(self) -> None:
+        for key in list(self.selector.get_map().values()):
+            key.fileobj.close()
+        self.selector.close()
+        os.unlink(self.socket_path)
+
+    def send(self, payload: bytes) -> None:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as client:
+            client.sendto(payload, self.socket_path)
+
+    def test_datagram_commands_are_read_without_stdin(self) -> None:
+        self.send(b"RUN_D\n run_w \n")
+
+        self.assertEqual(rei_cloud_automation.poll_trigger_socket(self.selector, 1), ["run_d", "run_w"])
+
+    def test_idle_socket_returns_no_commands(self) -> None:
+        self.assertEqual(rei_cloud_automation.poll_trigger_socket(self.selector, 0), [])
+
+
+if __name__ == "__main__":
+    unittest.main()